@@ -1,14 +1,62 @@
+import time
+_STARTUP_BEGIN = time.perf_counter()  # Start of the "imports" startup phase
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, simpledialog, filedialog
 import datetime
-from datetime import datetime, timedelta
-import time
+from datetime import datetime, timedelta, timezone
 import threading
-import pygame
+import heapq
+import bisect
+import itertools
 from pathlib import Path
 import math
 import os
-import pytz
+import sys
+import json
+import queue
+import shlex
+import subprocess
+import collections
+import hashlib
+import csv
+import mmap
+from array import array
+
+# pygame, pytz and numpy are slow to import and not needed for the first
+# paint, so they are imported on first use through the loaders below
+pygame = None
+pytz = None
+np = None
+_numpy_checked = False
+
+
+def load_pygame():
+    global pygame
+    if pygame is None:
+        import pygame as module
+        pygame = module
+    return pygame
+
+
+def load_pytz():
+    global pytz
+    if pytz is None:
+        import pytz as module
+        pytz = module
+    return pytz
+
+
+def load_numpy():
+    """Return numpy, or None when it is not installed (it is optional)"""
+    global np, _numpy_checked
+    if not _numpy_checked:
+        try:
+            import numpy as module
+            np = module
+        except ImportError:
+            np = None
+        _numpy_checked = True
+    return np
 
 
 # Color scheme
@@ -127,27 +175,1850 @@ class CustomStyle:
                       bordercolor=[('focus', COLORS['primary'])])
 
 
+# Deadlines are monotonic nanoseconds. Both clocks are sampled once so that
+# converting a wall-clock time to a deadline and back is exact.
+_WALL_ANCHOR_NS = time.time_ns()
+_MONO_ANCHOR_NS = time.monotonic_ns()
+_EPOCH = datetime(1970, 1, 1)
+MAX_TIMER_SECONDS = 100 * 366 * 24 * 3600  # Longest timer accepted, well inside datetime's range
+
+
+def deadline_from_datetime(dt):
+    """Monotonic deadline for a naive local (or aware) datetime"""
+    wall_ns = round(dt.timestamp() * 1_000_000) * 1000
+    return wall_ns - _WALL_ANCHOR_NS + _MONO_ANCHOR_NS
+
+
+def deadline_to_wall_ns(deadline):
+    """Wall-clock nanoseconds since the epoch of a monotonic deadline"""
+    return deadline - _MONO_ANCHOR_NS + _WALL_ANCHOR_NS
+
+
+def deadline_from_wall_ns(wall_ns):
+    return wall_ns - _WALL_ANCHOR_NS + _MONO_ANCHOR_NS
+
+
+def deadline_to_utc(deadline):
+    """Naive UTC datetime of a monotonic deadline"""
+    return _EPOCH + timedelta(microseconds=(deadline - _MONO_ANCHOR_NS + _WALL_ANCHOR_NS) // 1000)
+
+
+def deadline_to_datetime(deadline):
+    """Naive local datetime of a monotonic deadline"""
+    return deadline_to_utc(deadline).replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+
+
+def format_remaining(remaining_ns):
+    # Same text as str(timedelta) without the fraction, e.g. "0:04:59"
+    return str(timedelta(seconds=max(0, remaining_ns) // 1_000_000_000))
+
+
+class CodeTable:
+    """Interns short names (timer types, sounds, actions) as small integer codes"""
+    def __init__(self, *names):
+        self.names = []
+        self.codes = {}
+        for name in names:
+            self.code(name)
+
+
+    def code(self, name):
+        code = self.codes.get(name)
+        if code is None:
+            code = self.codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+
+TIMER_TYPES = CodeTable('default', 'duration', 'target', 'minutes', 'seconds', 'recurring')
+SOUND_TYPES = CodeTable('beep', 'melody', 'gentle')
+ACTION_TYPES = CodeTable('alert', 'command', 'file')
+
+
+class Recurrence:
+    """Repeat rule of a recurring timer
+
+    Rules are written as text:
+        every 15m, every 2h, every 90s   fixed interval between firings
+        daily 07:30, weekdays 07:30,
+        mon,wed,fri 18:00                wall-clock times in the rule's zone
+        cron 0 9 * * 1-5                 minute hour day month weekday
+    Calendar rules become cron fields whose next match is searched in the
+    zone's wall time, so a DST change moves the UTC firing time with it.
+    """
+    UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+    DAY_NAMES = ('sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat')  # Cron numbering
+    DAY_ALIASES = {'daily': '*', 'weekdays': '1-5', 'weekends': '0,6'}
+    FIELD_RANGES = ((0, 59), (0, 23), (1, 31), (1, 12), (0, 7))
+    SEARCH_DAYS = 366 * 5  # Enough for rules like "29 February"
+
+    def __init__(self, text, timezone_name="Local Time"):
+        self.text = text.strip()
+        self.timezone_name = timezone_name
+        self.interval = None  # Nanoseconds, for "every" rules
+        words = self.text.lower().split()
+        if not words:
+            raise ValueError("Empty repeat rule")
+        
+        if words[0] == 'every' and len(words) == 2:
+            amount, unit = words[1][:-1], words[1][-1]
+            if unit not in self.UNITS or not amount.isdigit() or int(amount) == 0:
+                raise ValueError(f"Invalid interval '{words[1]}', use e.g. 15m, 2h or 90s")
+            self.interval = int(amount) * self.UNITS[unit] * 1_000_000_000
+            return
+        
+        if words[0] == 'cron' and len(words) == 6:
+            fields = words[1:]
+        elif len(words) == 2 and ':' in words[1]:
+            hour, _, minute = words[1].partition(':')
+            fields = [minute, hour, '*', '*', self.DAY_ALIASES.get(words[0], words[0])]
+        else:
+            raise ValueError(f"Invalid repeat rule '{self.text}'")
+        
+        for number, name in enumerate(self.DAY_NAMES):
+            fields[4] = fields[4].replace(name, str(number))
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            sorted(self._parse_field(field, low, high))
+            for field, (low, high) in zip(fields, self.FIELD_RANGES))
+        self.weekdays = {weekday % 7 for weekday in self.weekdays}  # 7 is Sunday too
+        self.days = set(self.days)
+        self.months = set(self.months)
+        # Like cron, a restricted day and weekday match when either of them does
+        self.any_day = fields[2] == '*'
+        self.any_weekday = fields[4] == '*'
+
+
+    @staticmethod
+    def _parse_field(field, low, high):
+        values = set()
+        for part in field.split(','):
+            span, _, step = part.partition('/')
+            try:
+                if span == '*':
+                    start, stop = low, high
+                elif '-' in span:
+                    start, stop = map(int, span.split('-'))
+                else:
+                    start = int(span)
+                    stop = high if step else start
+                step = int(step) if step else 1
+            except ValueError:
+                raise ValueError(f"Invalid repeat field '{field}'") from None
+            if not low <= start <= stop <= high or step < 1:
+                raise ValueError(f"Repeat field '{field}' is out of range {low}-{high}")
+            values.update(range(start, stop + 1, step))
+        return values
+
+
+    def _day_matches(self, day):
+        day_ok = day.day in self.days
+        weekday_ok = (day.weekday() + 1) % 7 in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+
+    def next_wall_time(self, after):
+        """First naive wall time matching the rule, strictly after `after`"""
+        start = after.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        day = start.replace(hour=0, minute=0)
+        for _ in range(self.SEARCH_DAYS):
+            if day.month in self.months and self._day_matches(day):
+                for hour in self.hours:
+                    for minute in self.minutes:
+                        candidate = day.replace(hour=hour, minute=minute)
+                        if candidate >= start:
+                            return candidate
+            day += timedelta(days=1)
+        return None
+
+
+    def next_deadline(self, after, now, tz_manager):
+        """Monotonic deadline of the first occurrence after both `after` and `now`
+
+        Returns None when a calendar rule never matches again.
+        """
+        if self.interval is not None:
+            # Skip occurrences missed while the app was closed or busy
+            missed = max(0, now - after) // self.interval
+            return after + (missed + 1) * self.interval
+        
+        after = max(after, now)
+        wall = tz_manager.from_utc(deadline_to_utc(after), self.timezone_name).replace(tzinfo=None)
+        while True:
+            wall = self.next_wall_time(wall)
+            if wall is None:
+                return None
+            utc = tz_manager.to_utc(wall, self.timezone_name)
+            deadline = deadline_from_wall_ns((utc - _EPOCH) // timedelta(microseconds=1) * 1000)
+            # Wall times repeated when clocks go back map to the past; keep looking
+            if deadline > after:
+                return deadline
+
+
+class GroupPipeline:
+    """A timer group run step after step, optionally repeated
+
+    The end offset of every step is computed up front from the start time, so
+    the chain does not drift with firing latency, and only the running step
+    is ever scheduled; the engine creates the next one when it finishes.
+    """
+    def __init__(self, name, timer_configs, repeat=1, start=None):
+        if repeat < 1:
+            raise ValueError(f"invalid repeat count {repeat}")
+        if not timer_configs:
+            raise ValueError("a group needs at least one timer")
+        self.name = name
+        self.steps = list(timer_configs)
+        self.repeat = repeat
+        self.start = time.monotonic_ns() if start is None else start
+        self.offsets = list(itertools.accumulate(
+            int(config['duration'] * 1_000_000_000) for config in self.steps * repeat))
+
+
+    def __len__(self):
+        return len(self.offsets)
+
+
+    def make_timer(self, step):
+        config = self.steps[step % len(self.steps)]
+        name = config['name']
+        if self.repeat > 1:
+            name = f"{name} ({step // len(self.steps) + 1}/{self.repeat})"
+        return Timer(name, None, config['type'], config['sound'],
+                     deadline=self.start + self.offsets[step], pipeline=self, step=step)
+
+
 class Timer:
-    def __init__(self, name, end_time, timer_type='default', sound_type='beep', action_type='alert', action_path=None):
+    __slots__ = ('id', 'name', 'deadline', 'type_code', 'sound_code', 'action_code',
+                 'action_path', 'active', 'recurrence', 'pipeline', 'step')
+    _ids = itertools.count(1)
+
+    def __init__(self, name, end_time=None, timer_type='default', sound_type='beep', action_type='alert',
+                 action_path=None, deadline=None, recurrence=None, pipeline=None, step=0):
+        self.id = next(Timer._ids)  # Stable id, also used as the Treeview item id
         self.name = name
-        self.end_time = end_time
-        self.timer_type = timer_type
-        self.sound_type = sound_type
-        self.action_type = action_type
+        self.deadline = deadline if deadline is not None else deadline_from_datetime(end_time)
+        if self.deadline - time.monotonic_ns() > MAX_TIMER_SECONDS * 1_000_000_000:
+            raise ValueError("timers can run for at most 100 years")
+        self.type_code = TIMER_TYPES.code(timer_type)
+        self.sound_code = SOUND_TYPES.code(sound_type)
+        self.action_code = ACTION_TYPES.code(action_type)
         self.action_path = action_path
         self.active = True
-        self.thread = None
+        self.recurrence = recurrence  # Recurrence of a repeating timer, else None
+        self.pipeline = pipeline  # GroupPipeline this timer is step `step` of, else None
+        self.step = step
+
+
+    @classmethod
+    def after(cls, name, seconds, *args, now=None, **kwargs):
+        """Create a timer that ends `seconds` from the monotonic time `now`"""
+        now = time.monotonic_ns() if now is None else now
+        if not seconds <= MAX_TIMER_SECONDS:  # Also rejects inf and nan
+            raise ValueError("timers can run for at most 100 years")
+        return cls(name, None, *args, deadline=now + int(seconds * 1_000_000_000), **kwargs)
 
 
-    def time_remaining(self):
+    @property
+    def timer_type(self):
+        return TIMER_TYPES.names[self.type_code]
+
+
+    @property
+    def sound_type(self):
+        return SOUND_TYPES.names[self.sound_code]
+
+
+    @property
+    def action_type(self):
+        return ACTION_TYPES.names[self.action_code]
+
+
+    @property
+    def end_time(self):
+        return deadline_to_datetime(self.deadline)
+
+
+    def remaining_ns(self, now=None):
         if not self.active:
-            return datetime.timedelta()
-        remaining = self.end_time - datetime.now()
-        return remaining if remaining.total_seconds() > 0 else datetime.timedelta()
+            return 0
+        now = time.monotonic_ns() if now is None else now
+        return max(0, self.deadline - now)
+
+
+    def time_remaining(self, now=None):
+        return timedelta(microseconds=self.remaining_ns(now) // 1000)
+
+
+    def is_finished(self, now=None):
+        return self.remaining_ns(now) <= 0
+
+
+class Histogram:
+    """Log-linear histogram of non-negative integers, HDR style
+
+    Values keep their top SUB_BITS bits, which bounds the relative error of
+    reported percentiles to about 3% at constant memory per magnitude.
+    """
+    SUB_BITS = 5
+    HALF = 1 << (SUB_BITS - 1)
+
+    def __init__(self):
+        self.counts = {}  # Bucket -> count
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+
+    def record(self, value):
+        value = max(0, int(value))
+        shift = max(0, value.bit_length() - self.SUB_BITS)
+        bucket = shift * self.HALF + (value >> shift)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = max(self.max, value)
+
+
+    def _bucket_value(self, bucket):
+        # Middle of the value range that falls into the bucket
+        if bucket < 2 * self.HALF:
+            return bucket
+        shift = bucket // self.HALF - 1
+        return ((bucket - shift * self.HALF) << shift) + (1 << shift) // 2
+
+
+    def percentile(self, percent):
+        if not self.count:
+            return 0
+        threshold = self.count * percent / 100
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= threshold:
+                return min(self._bucket_value(bucket), self.max)
+        return self.max
+
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "min": self.min or 0,
+            "mean": self.total / self.count if self.count else 0,
+            "p50": self.percentile(50),
+            "p90": self.percentile(90),
+            "p99": self.percentile(99),
+            "p99.9": self.percentile(99.9),
+            "max": self.max
+        }
+
+
+class Stats:
+    """Always-on timing histograms (in microseconds) and gauges"""
+    def __init__(self):
+        self.histograms = collections.defaultdict(Histogram)
+        self.gauges = {}  # Name -> callable returning the current value
+        self._lock = threading.Lock()
+
+
+    def record(self, name, microseconds):
+        with self._lock:
+            self.histograms[name].record(microseconds)
+
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+
+
+    def snapshot(self):
+        with self._lock:
+            histograms = {name: hist.summary() for name, hist in sorted(self.histograms.items())}
+        return {
+            "histograms_us": histograms,
+            "gauges": {name: gauge() for name, gauge in self.gauges.items()}
+        }
+
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as dump_file:
+            json.dump(self.snapshot(), dump_file, indent=2)
+
+
+class HeapBackend:
+    """Timer ordering by a deadline heap
+
+    Cancelled timers stay in the heap until they reach the top, and are
+    compacted in bulk once they make up most of it.
+    """
+    def __init__(self):
+        self._heap = []  # (deadline, sequence, timer)
+        self._sequence = itertools.count()
+        self._cancelled = 0
+
+
+    def __len__(self):
+        return len(self._heap) - self._cancelled
+
+
+    def add(self, timer):
+        heapq.heappush(self._heap, (timer.deadline, next(self._sequence), timer))
+
+
+    def cancel(self, timer):
+        self._cancelled += 1
+        # Drop dead entries once they make up most of the heap
+        if self._cancelled > 64 and self._cancelled * 2 > len(self._heap):
+            self._heap = [entry for entry in self._heap if entry[2].active]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+
+
+    def next_wakeup(self):
+        """Earliest deadline, or None without timers"""
+        while self._heap and not self._heap[0][2].active:
+            heapq.heappop(self._heap)
+            self._cancelled = max(0, self._cancelled - 1)
+        return self._heap[0][0] if self._heap else None
+
+
+    def pop_due(self, now):
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            timer = heapq.heappop(self._heap)[2]
+            if timer.active:
+                due.append(timer)
+            else:
+                self._cancelled = max(0, self._cancelled - 1)
+        return due
+
+
+class TimingWheelBackend:
+    """Timer ordering by a hierarchical timing wheel, O(1) insert and cancel
+
+    Deadlines are rounded up to whole ticks of tick_ns. Level 0 has one slot
+    per tick and every level above covers SLOTS times the span of the one
+    below; when time reaches a higher-level slot its timers cascade down to
+    finer levels. Timers beyond the top level wait in an overflow slot. A
+    cancelled timer is removed from its slot right away.
+    """
+    SLOT_BITS = 6
+    SLOTS = 1 << SLOT_BITS
+    MASK = SLOTS - 1
+
+    def __init__(self, tick_ns=1_000_000, levels=6, now=None):
+        self.tick_ns = tick_ns
+        self.levels = levels
+        self.current = (time.monotonic_ns() if now is None else now) // tick_ns  # Last tick processed
+        self._wheels = [[{} for _ in range(self.SLOTS)] for _ in range(levels)]
+        self._overflow = {}
+        # (level, timers) of every slot, shared so placing allocates nothing
+        self._cells = [[(level, slot) for slot in wheel] for level, wheel in enumerate(self._wheels)]
+        self._overflow_cell = (levels, self._overflow)
+        self._counts = [0] * (levels + 1)  # Timers per level, overflow last
+        self._location = {}  # Timer id -> cell, or None while in _due
+        self._due = []  # Timers that were already due when placed
+
+
+    def __len__(self):
+        return len(self._location)
+
+
+    def add(self, timer):
+        self._place(timer)
+
+
+    def _place(self, timer):
+        expiry = -(-timer.deadline // self.tick_ns)
+        delta = expiry - self.current
+        if delta <= 0:
+            self._due.append(timer)
+            self._location[timer.id] = None
+            return
+        
+        level = (delta.bit_length() - 1) // self.SLOT_BITS
+        if level < self.levels:
+            cell = self._cells[level][(expiry >> (self.SLOT_BITS * level)) & self.MASK]
+        else:
+            cell = self._overflow_cell
+        cell[1][timer.id] = timer
+        self._location[timer.id] = cell
+        self._counts[cell[0]] += 1
+
+
+    def cancel(self, timer):
+        cell = self._location.pop(timer.id, None)
+        if cell is None:
+            return  # Not here, or in _due where inactive timers are skipped
+        del cell[1][timer.id]
+        self._counts[cell[0]] -= 1
+
+
+    def _take(self, level, slot):
+        timers = self._overflow if level == self.levels else self._wheels[level][slot]
+        taken = list(timers.values())
+        timers.clear()
+        self._counts[level] -= len(taken)
+        for timer in taken:
+            del self._location[timer.id]
+        return taken
+
+
+    def _advance(self, tick):
+        self.current = tick
+        # Cascade every level whose slot starts at this tick, coarsest first
+        for level in range(self.levels, 0, -1):
+            shift = self.SLOT_BITS * level
+            if tick & ((1 << shift) - 1) == 0 and self._counts[level]:
+                for timer in self._take(level, (tick >> shift) & self.MASK):
+                    self._place(timer)
+        if self._counts[0]:
+            self._due.extend(self._take(0, tick & self.MASK))
+
+
+    def next_wakeup(self):
+        """When timers are next due to fire or cascade, or None without timers"""
+        if self._due:
+            return 0
+        tick = self._next_tick()
+        return None if tick is None else tick * self.tick_ns
+
+
+    def _next_tick(self):
+        # Every level's first occupied slot after the current tick
+        wakeup = None
+        for level in range(self.levels):
+            if not self._counts[level]:
+                continue
+            shift = self.SLOT_BITS * level
+            base = self.current >> shift
+            wheel = self._wheels[level]
+            for offset in range(1, self.SLOTS + 1):
+                if wheel[(base + offset) & self.MASK]:
+                    tick = (base + offset) << shift
+                    wakeup = tick if wakeup is None else min(wakeup, tick)
+                    break
+        if self._counts[self.levels]:
+            shift = self.SLOT_BITS * self.levels
+            tick = ((self.current >> shift) + 1) << shift
+            wakeup = tick if wakeup is None else min(wakeup, tick)
+        return wakeup
+
+
+    def pop_due(self, now):
+        target = now // self.tick_ns
+        while self.current < target:
+            # Skip the ticks where nothing fires or cascades
+            tick = self._next_tick()
+            if tick is None or tick > target:
+                self.current = target
+                break
+            self._advance(tick)
+        
+        due, self._due = self._due, []
+        for timer in due:
+            self._location.pop(timer.id, None)
+        return [timer for timer in due if timer.active]
+
+
+class TimerScheduler:
+    """Fires timers from a single background thread
+
+    The thread sleeps until the backend's next wakeup. The backend only keeps
+    timers ordered: a HeapBackend by default, or a TimingWheelBackend for
+    large numbers of short-lived timers.
+    """
+    def __init__(self, on_fire, backend=None):
+        self.on_fire = on_fire
+        self.backend = backend if backend is not None else HeapBackend()
+        self._wakeup = None  # When the thread is due to wake, None while idle
+        self._condition = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+
+    def add(self, timer):
+        self.add_many([timer])
+
+
+    def add_many(self, timers):
+        with self._condition:
+            earliest = None
+            for timer in timers:
+                self.backend.add(timer)
+                if earliest is None or timer.deadline < earliest:
+                    earliest = timer.deadline
+            # Only wake the scheduler if a new timer is due before it wakes anyway
+            if earliest is not None and (self._wakeup is None or earliest < self._wakeup):
+                self._condition.notify()
+
+
+    def cancel(self, timer):
+        with self._condition:
+            timer.active = False
+            self.backend.cancel(timer)
+
+
+    def shutdown(self):
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+
+
+    def _pop_due(self):
+        """Wait until timers are due and return them"""
+        with self._condition:
+            while self._running:
+                now = time.monotonic_ns()
+                due = self.backend.pop_due(now)
+                if due:
+                    self._wakeup = None
+                    return due
+                
+                self._wakeup = self.backend.next_wakeup()
+                if self._wakeup is None:
+                    self._condition.wait()
+                elif self._wakeup > now:
+                    # Far deadlines would overflow the wait; wake up and re-check
+                    delay = (self._wakeup - now) / 1_000_000_000
+                    self._condition.wait(min(delay, threading.TIMEOUT_MAX, 86400))
+            return []
+
+
+    def _run(self):
+        while self._running:
+            for timer in self._pop_due():
+                # Callbacks run outside the lock so they can add new timers.
+                # A failing callback must not stop the scheduler thread.
+                try:
+                    self.on_fire(timer)
+                except Exception as error:
+                    print(f"Timer '{timer.name}' callback failed: {error!r}", file=sys.stderr)
+
+
+class TkEventLoop:
+    """Runs an asyncio event loop on the Tk thread, interleaved with Tk events
+
+    Instead of blocking in run_forever(), the loop is stepped from root.after
+    callbacks. The loop's own queues are not inspected: whoever schedules work
+    on it calls wake(when), and sources registered with add_source report
+    their earliest pending time after every step.
+    """
+    def __init__(self, root):
+        import asyncio
+        self.root = root
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._after_id = None
+        self._planned = None  # Loop time of the planned step, None while idle
+        self._sources = []  # Callables returning their earliest pending loop time, or None
+
+
+    def add_source(self, next_time):
+        self._sources.append(next_time)
+
+
+    def wake(self, when=None):
+        """Step the loop at loop time `when`, or once Tk is idle without one
+
+        Nothing changes if a step is already planned no later than that.
+        """
+        if self.loop.is_closed():
+            return
+        now = self.loop.time()
+        when = now if when is None else when
+        if self._planned is not None and self._planned <= when:
+            return
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        self._planned = when
+        if when <= now:
+            self._after_id = self.root.after_idle(self._step)
+        else:
+            self._after_id = self.root.after(int((when - now) * 1000) + 1, self._step)
+
+
+    def _step(self):
+        self._after_id = None
+        self._planned = None
+        # Run everything that is ready now, then hand control back to Tk
+        self.loop.call_soon(self.loop.stop)
+        self.loop.run_forever()
+        pending = [when for when in (source() for source in self._sources) if when is not None]
+        if pending:
+            self.wake(min(pending))
+
+
+    def close(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        self.loop.close()
+
+
+class AsyncioScheduler:
+    """Fires timers as loop.call_at handles on a TkEventLoop, without threads
+
+    Timer deadlines are monotonic nanoseconds and asyncio's loop.time() is
+    time.monotonic(), so a deadline maps directly onto a call_at time.
+    """
+    def __init__(self, on_fire, event_loop):
+        self.on_fire = on_fire
+        self.event_loop = event_loop
+        self._handles = {}  # Timer id -> asyncio.TimerHandle
+        # (when, tiebreak, timer id, handle) of every handle created, stale ones dropped lazily
+        self._times = []
+        event_loop.add_source(self.next_time)
+
+
+    def add(self, timer):
+        self.add_many([timer])
+
+
+    def add_many(self, timers):
+        # One wake for the whole batch, at its earliest deadline
+        call_at = self.event_loop.loop.call_at
+        earliest = None
+        for timer in timers:
+            when = timer.deadline / 1_000_000_000
+            handle = self._handles[timer.id] = call_at(when, self._fire, timer)
+            heapq.heappush(self._times, (when, id(handle), timer.id, handle))
+            earliest = when if earliest is None else min(earliest, when)
+        if earliest is not None:
+            self.event_loop.wake(earliest)
+
+
+    def cancel(self, timer):
+        timer.active = False
+        handle = self._handles.pop(timer.id, None)
+        if handle is not None:
+            handle.cancel()
+            if len(self._times) > 2 * len(self._handles) + 64:
+                # Mostly cancelled handles: rebuild instead of letting them pile up
+                handles = self._handles
+                self._times = [entry for entry in self._times if handles.get(entry[2]) is entry[3]]
+                heapq.heapify(self._times)
+
+
+    def next_time(self):
+        """Loop time of the earliest handle still pending, or None"""
+        times = self._times
+        # Fired handles are no longer in _handles, cancelled ones are marked
+        while times and self._handles.get(times[0][2]) is not times[0][3]:
+            heapq.heappop(times)
+        return times[0][0] if times else None
+
+
+    def shutdown(self):
+        for handle in self._handles.values():
+            handle.cancel()
+        self._handles.clear()
+        self._times.clear()
+
+
+    def _fire(self, timer):
+        del self._handles[timer.id]
+        if timer.active:
+            self.on_fire(timer)
+
+
+class SortedChunks:
+    """Sorted sequence stored as a list of short sorted chunks
+
+    Insert and removal bisect the chunk maxima and then shift one chunk of at
+    most 2 * LOAD items, so their cost stays sublinear (O(log n + LOAD + n / LOAD))
+    instead of moving the whole list. Large batches are merged in one sort.
+    """
+    LOAD = 512
+
+    def __init__(self):
+        self._chunks = []
+        self._maxes = []  # Last item of each chunk
+        self._len = 0
+
+
+    def __len__(self):
+        return self._len
+
+
+    def add(self, item):
+        chunks, maxes = self._chunks, self._maxes
+        if not chunks:
+            chunks.append([item])
+            maxes.append(item)
+        else:
+            index = bisect.bisect_left(maxes, item)
+            if index == len(maxes):
+                index -= 1
+                chunks[index].append(item)
+                maxes[index] = item
+            else:
+                bisect.insort(chunks[index], item)
+            if len(chunks[index]) > 2 * self.LOAD:
+                chunk = chunks[index]
+                chunks[index:index + 1] = [chunk[:self.LOAD], chunk[self.LOAD:]]
+                maxes[index:index + 1] = [chunk[self.LOAD - 1], chunk[-1]]
+        self._len += 1
+
+
+    def update(self, items):
+        """Add many items; a batch as big as the contents is merged by one sort"""
+        if len(items) < max(self._len, self.LOAD):
+            for item in items:
+                self.add(item)
+            return
+        merged = [item for chunk in self._chunks for item in chunk]
+        merged.extend(items)
+        merged.sort()
+        load = self.LOAD
+        self._chunks = [merged[start:start + load] for start in range(0, len(merged), load)]
+        self._maxes = [chunk[-1] for chunk in self._chunks]
+        self._len = len(merged)
+
+
+    def remove(self, item):
+        chunks, maxes = self._chunks, self._maxes
+        index = bisect.bisect_left(maxes, item)
+        chunk = chunks[index]
+        position = bisect.bisect_left(chunk, item)
+        if chunk[position] != item:
+            raise ValueError(f"{item!r} not in list")
+        del chunk[position]
+        self._len -= 1
+        if not chunk:
+            del chunks[index]
+            del maxes[index]
+        elif position == len(chunk):
+            maxes[index] = chunk[-1]
+
+
+    def first(self):
+        return self._chunks[0][0] if self._chunks else None
+
+
+    def slice(self, start=0, stop=None):
+        """Items start:stop in order, skipping whole chunks to reach start"""
+        start, stop, _ = slice(start, stop).indices(self._len)
+        result = []
+        offset = 0
+        for chunk in self._chunks:
+            if offset >= stop:
+                break
+            size = len(chunk)
+            if offset + size > start:
+                result.extend(chunk[max(0, start - offset):stop - offset])
+            offset += size
+        return result
+
+
+class TimerStore:
+    """Active timers indexed by id, name and type, and kept in sorted order
+
+    Each sort mode keeps its (key, id) pairs in a SortedChunks, so listing
+    never sorts from scratch and inserts and removals stay sublinear.
+    """
+    SORT_KEYS = {
+        'time': lambda timer: timer.deadline,
+        'name': lambda timer: timer.name.lower(),
+        'type': lambda timer: timer.timer_type
+    }
+
+    def __init__(self):
+        self.by_id = {}
+        self.by_name = {}  # Name -> {id: timer}
+        self.by_type = {}  # Type code -> {id: timer}
+        self._ordered = {mode: SortedChunks() for mode in self.SORT_KEYS}
+
+
+    def __len__(self):
+        return len(self.by_id)
+
+
+    def __contains__(self, timer):
+        return timer.id in self.by_id
+
+
+    def add(self, timer):
+        self.by_id[timer.id] = timer
+        self.by_name.setdefault(timer.name, {})[timer.id] = timer
+        self.by_type.setdefault(timer.type_code, {})[timer.id] = timer
+        for mode, key in self.SORT_KEYS.items():
+            self._ordered[mode].add((key(timer), timer.id))
+
+
+    def add_many(self, timers):
+        for timer in timers:
+            self.by_id[timer.id] = timer
+            self.by_name.setdefault(timer.name, {})[timer.id] = timer
+            self.by_type.setdefault(timer.type_code, {})[timer.id] = timer
+        for mode, key in self.SORT_KEYS.items():
+            self._ordered[mode].update([(key(timer), timer.id) for timer in timers])
+
+
+    def remove(self, timer):
+        if self.by_id.pop(timer.id, None) is None:
+            return False
+        for index, key in ((self.by_name, timer.name), (self.by_type, timer.type_code)):
+            bucket = index[key]
+            del bucket[timer.id]
+            if not bucket:
+                del index[key]
+        for mode, key in self.SORT_KEYS.items():
+            self._ordered[mode].remove((key(timer), timer.id))
+        return True
+
+
+    def ordered(self, mode='time', start=0, stop=None):
+        """Return active timers in the given sort order, optionally a slice of them"""
+        by_id = self.by_id
+        return [by_id[timer_id] for _, timer_id in self._ordered[mode].slice(start, stop)]
+
+
+    def first(self, mode='time'):
+        first = self._ordered[mode].first()
+        return self.by_id[first[1]] if first else None
+
+
+    def count_by_type(self, timer_type):
+        return len(self.by_type.get(TIMER_TYPES.codes.get(timer_type), ()))
+
+
+class TimerEngine:
+    """All timer state and scheduling, independent of any user interface
+
+    Subscribers are called as callback(event, timers) with event being one of
+    'added', 'stopped', 'finished', 'rearmed' or 'removed'. A recurring timer
+    is published as 'finished' and then 'rearmed' once it is back in the
+    store with its next deadline. When a step of a sequential group finishes,
+    the next step is published as 'added'. With the default threaded
+    scheduler 'finished' is delivered from the scheduler thread, so UI
+    subscribers must hand it to their own loop.
+    """
+    MAX_COMPLETED = 10_000  # Finished timers kept for the UI, oldest evicted first
+
+    def __init__(self, scheduler_factory=TimerScheduler, tz_manager=None):
+        self.store = TimerStore()  # Timers that are still counting down
+        self.tz_manager = tz_manager or TimeZoneManager()  # For calendar recurrences
+        self._completed = {}  # Finished timers, until removed or evicted
+        self._lock = threading.RLock()
+        self._subscribers = []
+        self.scheduler = scheduler_factory(self._on_due)
+        self.stats = Stats()
+        self.stats.gauges.update({
+            "active_timers": self.active_count,
+            "completed_timers": lambda: len(self._completed),
+            "threads": threading.active_count
+        })
+
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+        return lambda: self._subscribers.remove(callback)
+
+
+    def _publish(self, event, timers):
+        # Each subscriber is isolated, so one failing cannot hide an event from the rest
+        for callback in list(self._subscribers):
+            try:
+                callback(event, timers)
+            except Exception as error:
+                print(f"Subscriber failed on '{event}': {error!r}", file=sys.stderr)
+
+
+    def add(self, timer):
+        self.add_many([timer])
+        return timer.id
+
+
+    def add_many(self, timers):
+        with self._lock:
+            self.store.add_many(timers)
+            self.scheduler.add_many(timers)
+        self._publish('added', timers)
+
+
+    def start_group(self, timer_configs, sequential=False, repeat=1, name=None):
+        """Start a timer group and return the timers started now
+
+        By default every entry starts at once. A sequential group runs its
+        entries back to back, `repeat` times, as a GroupPipeline.
+        """
+        if repeat < 1:
+            raise ValueError(f"invalid repeat count {repeat}")
+        if sequential:
+            timer = GroupPipeline(name, timer_configs, repeat).make_timer(0)
+            self.add(timer)
+            return [timer]
+        
+        now = time.monotonic_ns()
+        timers = [Timer.after(config['name'], config['duration'],
+                              config['type'], config['sound'], now=now)
+                  for config in timer_configs]
+        self.add_many(timers)
+        return timers
+
+
+    def get(self, timer_id):
+        return self.store.by_id.get(timer_id) or self._completed.get(timer_id)
+
+
+    def find(self, name):
+        """Return the active timers with the given name"""
+        return list(self.store.by_name.get(name, {}).values())
+
+
+    def stop(self, timer_id):
+        stopped = self.stop_many([timer_id])
+        return stopped[0] if stopped else None
+
 
+    def stop_many(self, timer_ids):
+        """Stop the given timers and publish them as one 'stopped' event"""
+        stopped = []
+        with self._lock:
+            for timer_id in timer_ids:
+                timer = self.store.by_id.get(timer_id)
+                if timer is None:
+                    continue
+                # Stopped timers are dropped right away; only finished ones are kept
+                self.scheduler.cancel(timer)
+                self.store.remove(timer)
+                stopped.append(timer)
+        if stopped:
+            self._publish('stopped', stopped)
+        return stopped
+
+
+    def list(self, sort='time', start=0, stop=None):
+        """Return active timers ordered by 'time', 'name' or 'type'"""
+        with self._lock:
+            return self.store.ordered(sort, start, stop)
+
+
+    def active_count(self):
+        return len(self.store)
+
+
+    def next_due(self):
+        with self._lock:
+            return self.store.first('time')
 
-    def is_finished(self):
-        return self.time_remaining().total_seconds() <= 0
+
+    def remove_completed(self):
+        with self._lock:
+            removed = list(self._completed.values())
+            self._completed.clear()
+        if removed:
+            self._publish('removed', removed)
+        return removed
+
+
+    def shutdown(self):
+        self.scheduler.shutdown()
+
+
+    def _on_due(self, timer):
+        # How late the timer fired compared to its deadline
+        now = time.monotonic_ns()
+        self.stats.record('fire.lateness', (now - timer.deadline) // 1000)
+        with self._lock:
+            # A timer stopped between being popped and getting here is not finished
+            if not self.store.remove(timer):
+                return
+            deadline = next_step = None
+            if timer.recurrence is not None:
+                deadline = timer.recurrence.next_deadline(timer.deadline, now, self.tz_manager)
+            if deadline is None:
+                if len(self._completed) >= self.MAX_COMPLETED:
+                    del self._completed[next(iter(self._completed))]  # Oldest first
+                self._completed[timer.id] = timer
+            else:
+                # Sorted store keys depend on the deadline, so re-add after changing it
+                timer.deadline = deadline
+                self.store.add(timer)
+                self.scheduler.add(timer)
+            
+            if timer.pipeline is not None and timer.step + 1 < len(timer.pipeline):
+                next_step = timer.pipeline.make_timer(timer.step + 1)
+                self.store.add(next_step)
+                self.scheduler.add(next_step)
+        self._publish('finished', [timer])
+        if deadline is not None:
+            self._publish('rearmed', [timer])
+        if next_step is not None:
+            self._publish('added', [next_step])
+
+
+def timer_record(timer):
+    """Plain dict describing a timer, as stored by TimerJournal"""
+    return {
+        "id": timer.id,
+        "name": timer.name,
+        "end": deadline_to_wall_ns(timer.deadline),
+        "type": timer.timer_type,
+        "sound": timer.sound_type,
+        "action": timer.action_type,
+        "path": timer.action_path,
+        "repeat": timer.recurrence.text if timer.recurrence else None,
+        "zone": timer.recurrence.timezone_name if timer.recurrence else None,
+        "pipeline": {
+            "name": timer.pipeline.name,
+            "steps": timer.pipeline.steps,
+            "repeat": timer.pipeline.repeat,
+            "start": deadline_to_wall_ns(timer.pipeline.start),
+            "step": timer.step
+        } if timer.pipeline else None
+    }
+
+
+class TimerJournal:
+    """Crash-safe persistence of timers and groups
+
+    Every change is appended to a JSON-lines journal by a background writer
+    thread which fsyncs in batches. Every SNAPSHOT_EVERY events, and on close,
+    the live state is written to a compact snapshot and the journal is
+    truncated, so a restore is one snapshot read plus a short journal tail.
+    """
+    SNAPSHOT_EVERY = 1000
+    FSYNC_INTERVAL = 1.0  # Seconds between fsyncs while events keep coming
+
+    def __init__(self, directory=None):
+        self.directory = Path(directory) if directory else user_data_dir()
+        self.journal_path = self.directory / 'journal.jsonl'
+        self.snapshot_path = self.directory / 'snapshot.json'
+        self.timers = {}  # Timer id -> record, the state captured by snapshots
+        self.groups = {}  # Group name -> timer configs, None once deleted
+        self.enabled = True
+        self._queue = queue.Queue()
+        self._file = None
+        self._thread = None
+        self._events_since_snapshot = 0
+        self._restored_ids = set()  # Already in the snapshot, their 'added' is skipped
+
+
+    def restore(self, make_timer):
+        """Load saved state and start journaling
+
+        make_timer(record) builds a Timer from a saved record. Returns the
+        restored timers and the saved group changes.
+        """
+        timers, groups = {}, {}
+        try:
+            with open(self.snapshot_path, encoding='utf-8') as snapshot_file:
+                snapshot = json.load(snapshot_file)
+            timers = {record['id']: record for record in snapshot['timers']}
+            groups = snapshot['groups']
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError) as error:
+            print(f"Ignoring unreadable snapshot: {error}", file=sys.stderr)
+        
+        try:
+            with open(self.journal_path, encoding='utf-8') as journal_file:
+                for line in journal_file:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        break  # Torn last write from a crash
+                    self._apply(event, timers, groups)
+        except FileNotFoundError:
+            pass
+        except OSError as error:
+            print(f"Ignoring unreadable journal: {error}", file=sys.stderr)
+        
+        # Restored timers get new ids, so start from a fresh snapshot with them
+        restored = []
+        for record in timers.values():
+            try:
+                timer = make_timer(record)
+            except (ValueError, KeyError, TypeError) as error:
+                print(f"Ignoring saved timer {record.get('name')!r}: {error}", file=sys.stderr)
+                continue
+            restored.append(timer)
+            self.timers[timer.id] = timer_record(timer)
+            self._restored_ids.add(timer.id)
+        self.groups = groups
+        
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._write_snapshot()
+            self._file = open(self.journal_path, 'w', encoding='utf-8')
+        except OSError as error:
+            print(f"Timer persistence disabled: {error}", file=sys.stderr)
+            self.enabled = False
+            return restored, groups
+        
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return restored, groups
+
+
+    def on_engine_event(self, event, timers):
+        if event == 'added' and self._restored_ids:
+            restored_ids, self._restored_ids = self._restored_ids, set()
+            timers = [timer for timer in timers if timer.id not in restored_ids]
+        if event in ('added', 'rearmed'):
+            for timer in timers:
+                self.record({"op": "add", "timer": timer_record(timer)})
+        elif event in ('stopped', 'finished'):
+            for timer in timers:
+                self.record({"op": "remove", "id": timer.id})
+
+
+    def record_group(self, name, timer_configs):
+        self.record({"op": "group", "name": name, "timers": timer_configs})
+
+
+    def record_group_delete(self, name):
+        self.record({"op": "group", "name": name, "timers": None})
+
+
+    def record(self, event):
+        if self.enabled:
+            self._queue.put(event)
+
+
+    def close(self):
+        """Flush pending events and leave a compact snapshot behind"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+    @staticmethod
+    def _apply(event, timers, groups):
+        op = event.get('op')
+        if op == 'add':
+            timers[event['timer']['id']] = event['timer']
+        elif op == 'remove':
+            timers.pop(event['id'], None)
+        elif op == 'group':
+            groups[event['name']] = event['timers']
+
+
+    def _write_snapshot(self):
+        snapshot = {"timers": list(self.timers.values()), "groups": self.groups}
+        temp_path = self.snapshot_path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as snapshot_file:
+            json.dump(snapshot, snapshot_file, separators=(',', ':'))
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        self._events_since_snapshot = 0
+
+
+    def _compact(self):
+        self._file.flush()
+        self._write_snapshot()
+        # Everything in the journal is now part of the snapshot
+        self._file.seek(0)
+        self._file.truncate()
+
+
+    def _run(self):
+        dirty = False
+        last_sync = time.monotonic()
+        while True:
+            timeout = max(0.0, self.FSYNC_INTERVAL - (time.monotonic() - last_sync)) if dirty else None
+            try:
+                event = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                event = False  # Quiet period, just sync what was written
+            
+            try:
+                # Write everything that is already queued in one go
+                events = [] if event is False else [event]
+                while events and events[-1] is not None:
+                    try:
+                        events.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                closing = bool(events) and events[-1] is None
+                if closing:
+                    events.pop()
+                
+                lines = []
+                for item in events:
+                    self._apply(item, self.timers, self.groups)
+                    lines.append(json.dumps(item, separators=(',', ':')) + '\n')
+                if lines:
+                    self._file.write(''.join(lines))
+                    self._events_since_snapshot += len(lines)
+                    dirty = True
+                
+                if closing or self._events_since_snapshot >= self.SNAPSHOT_EVERY:
+                    self._compact()
+                if dirty and (closing or event is False
+                              or time.monotonic() - last_sync >= self.FSYNC_INTERVAL):
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+                    dirty = False
+                    last_sync = time.monotonic()
+                if closing:
+                    self._file.close()
+                    return
+            except OSError as error:
+                print(f"Timer persistence disabled: {error}", file=sys.stderr)
+                self.enabled = False
+                return
+
+
+TRANSFER_FIELDS = ('kind', 'group', 'name', 'end', 'duration', 'type', 'sound',
+                   'action', 'path', 'repeat', 'zone')
+IMPORT_BATCH = 1000  # Timers added to the engine (and refreshed) at a time
+
+
+def export_timers(path, timers, groups):
+    """Write timers and groups as JSON lines, or as CSV for a .csv path
+
+    In CSV every group entry is one 'group' row; JSON lines keep one line per
+    group and also preserve sequential group progress. Returns the number of
+    rows written.
+    """
+    rows = 0
+    with open(path, 'w', encoding='utf-8', newline='') as export_file:
+        if str(path).lower().endswith('.csv'):
+            writer = csv.DictWriter(export_file, TRANSFER_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+            for timer in timers:
+                writer.writerow(dict(timer_record(timer), kind='timer'))
+                rows += 1
+            for name, timer_configs in groups.items():
+                for config in timer_configs:
+                    writer.writerow(dict(config, kind='group', group=name))
+                    rows += 1
+        else:
+            for timer in timers:
+                record = timer_record(timer)
+                del record['id']
+                export_file.write(json.dumps(dict(record, kind='timer'), separators=(',', ':')) + '\n')
+                rows += 1
+            for name, timer_configs in groups.items():
+                export_file.write(json.dumps({"kind": "group", "name": name, "timers": timer_configs},
+                                             separators=(',', ':')) + '\n')
+                rows += 1
+    return rows
+
+
+def _number(record, field, low, high):
+    """Finite number in [low, high] from a record; rejects inf, nan and non-numbers"""
+    value = record[field]
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"invalid {field} {value!r}")
+    number = float(value)
+    if not low <= number <= high:
+        raise ValueError(f"invalid {field} '{value}'")
+    return number
+
+
+def _integer(record, field, low, high):
+    """Whole number in [low, high]; digit strings and large ints stay exact"""
+    value = record[field]
+    if isinstance(value, str) and value.strip().lstrip('-').isdigit():
+        value = int(value)
+    if isinstance(value, int) and not isinstance(value, bool):
+        if not low <= value <= high:
+            raise ValueError(f"invalid {field} '{value}'")
+        return value
+    number = _number(record, field, low, high)
+    if not number.is_integer():
+        raise ValueError(f"{field} must be a whole number, not '{value}'")
+    return int(number)
+
+
+def _text(record, field):
+    value = record.get(field)
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f"invalid {field} {value!r}")
+    return value
+
+
+def _name(record, field='name'):
+    name = (_text(record, field) or '').strip()
+    if not name:
+        raise ValueError(f"missing {field}")
+    return name
+
+
+def _choice(record, field, table, default):
+    value = record.get(field) or default
+    if value not in table.codes:
+        raise ValueError(f"unknown {field} '{value}'")
+    return value
+
+
+def group_config_from_import(record):
+    """Validated timer group entry from an imported record"""
+    if not isinstance(record, dict):
+        raise ValueError("group entry is not an object")
+    name = _name(record)
+    duration = _integer(record, 'duration', 1, MAX_TIMER_SECONDS)
+    return {"name": name, "duration": duration,
+            "type": _choice(record, 'type', TIMER_TYPES, 'duration'),
+            "sound": _choice(record, 'sound', SOUND_TYPES, 'beep')}
+
+
+def timer_from_import(record, now, tz_manager):
+    """Validated Timer from an imported record
+
+    The end is taken from 'end' (wall-clock nanoseconds) or 'duration'
+    (seconds from `now`); recurring timers may give neither and start at
+    their next occurrence.
+    """
+    saved = record.get('pipeline')
+    if saved:
+        if not isinstance(saved, dict) or not isinstance(saved.get('steps'), list) or not saved['steps']:
+            raise ValueError("invalid group pipeline")
+        steps = [group_config_from_import(config) for config in saved['steps']]
+        pipeline = GroupPipeline(_text(saved, 'name'), steps, _integer(saved, 'repeat', 1, 10_000),
+                                 deadline_from_wall_ns(_integer(saved, 'start', 0, 2 ** 63)))
+        step = _integer(saved, 'step', 0, len(pipeline) - 1)
+        return pipeline.make_timer(step)
+    
+    name = _name(record)
+    action = _choice(record, 'action', ACTION_TYPES, 'alert')
+    path = _text(record, 'path') or None
+    if action != 'alert' and not path:
+        raise ValueError(f"action '{action}' without a path")
+    
+    recurrence = None
+    if record.get('repeat'):
+        zone = _text(record, 'zone') or "Local Time"
+        if zone not in tz_manager.common_timezones:
+            raise ValueError(f"unknown zone '{zone}'")
+        recurrence = Recurrence(_text(record, 'repeat'), zone)
+    
+    if record.get('end') not in (None, ''):
+        deadline = deadline_from_wall_ns(_integer(record, 'end', 0, 2 ** 63))
+    elif record.get('duration') not in (None, ''):
+        seconds = _number(record, 'duration', -MAX_TIMER_SECONDS, MAX_TIMER_SECONDS)
+        deadline = now + int(seconds * 1_000_000_000)
+    elif recurrence is not None:
+        deadline = recurrence.next_deadline(now, now, tz_manager)
+        if deadline is None:
+            raise ValueError(f"'{recurrence.text}' never occurs")
+    else:
+        raise ValueError("timer needs an 'end' or a 'duration'")
+    
+    default_type = 'recurring' if recurrence is not None else 'duration'
+    return Timer(name, None, _choice(record, 'type', TIMER_TYPES, default_type),
+                 _choice(record, 'sound', SOUND_TYPES, 'beep'), action, path,
+                 deadline=deadline, recurrence=recurrence)
+
+
+def import_timers(path, engine, on_group=None, batch_size=IMPORT_BATCH, dispatch=None,
+                  allow_actions=False):
+    """Stream timers and groups from an export file into the engine
+
+    Records are read and validated one at a time and timers are added in
+    batches, so a batch is one 'added' event (one UI refresh) and the file is
+    never held in memory. Groups are passed to on_group(name, timer_configs).
+    dispatch(function) runs each engine call, e.g. on the thread that owns the
+    scheduler. Invalid records are skipped.
+    
+    A file from elsewhere must not run programs, so unless allow_actions is
+    set, 'command' and 'file' actions are imported as plain alerts and listed
+    in `dropped`. Returns (timers added, groups, errors, dropped).
+    """
+    dispatch = dispatch or (lambda function: function())
+    added = groups = 0
+    errors = []
+    dropped = []
+    batch = []
+    csv_groups = {}  # CSV spreads a group over several rows
+    now = time.monotonic_ns()
+    with open(path, encoding='utf-8', newline='') as import_file:
+        if str(path).lower().endswith('.csv'):
+            reader = csv.DictReader(import_file)
+            rows = ((reader.line_num, row) for row in reader)
+        else:
+            rows = enumerate(import_file, 1)
+        
+        for number, row in rows:
+            try:
+                if isinstance(row, str):
+                    if not row.strip():
+                        continue
+                    record = json.loads(row)
+                else:
+                    record = {key: value for key, value in row.items() if value not in (None, '')}
+                if not isinstance(record, dict):
+                    raise ValueError("not an object")
+                
+                kind = record.get('kind', 'timer')
+                if kind == 'timer':
+                    action = record.get('action')
+                    if not allow_actions and action not in (None, '', 'alert'):
+                        dropped.append(f"line {number}: {record.get('name')!r} would run "
+                                       f"{action} {record.get('path')!r}")
+                        record = dict(record, action='alert', path=None)
+                    batch.append(timer_from_import(record, now, engine.tz_manager))
+                elif kind == 'group' and 'group' in record:
+                    csv_groups.setdefault(_name(record, 'group'), []).append(group_config_from_import(record))
+                elif kind == 'group':
+                    name = _name(record)
+                    if not isinstance(record['timers'], list):
+                        raise ValueError("group 'timers' must be a list")
+                    timer_configs = [group_config_from_import(config) for config in record['timers']]
+                    if on_group is not None:
+                        on_group(name, timer_configs)
+                    groups += 1
+                else:
+                    raise ValueError(f"unknown kind '{kind}'")
+            except (ValueError, KeyError, TypeError, OverflowError, AttributeError) as error:
+                errors.append(f"line {number}: {error}")
+                continue
+            
+            if len(batch) >= batch_size:
+                dispatch(lambda batch=batch: engine.add_many(batch))
+                added += len(batch)
+                batch = []
+    
+    if batch:
+        dispatch(lambda: engine.add_many(batch))
+        added += len(batch)
+    for name, timer_configs in csv_groups.items():
+        if on_group is not None:
+            on_group(name, timer_configs)
+        groups += 1
+    return added, groups, errors, dropped
+
+
+def run_timer_action(action_type, action_path, timer_name, timeout):
+    """Run one completion action; executed in an ActionRunner worker process"""
+    started = time.monotonic()
+    try:
+        if action_type == 'command':
+            completed = subprocess.run(
+                shlex.split(action_path, posix=os.name != 'nt'),
+                capture_output=True, text=True, timeout=timeout,
+                env=dict(os.environ, SMART_TIMER_NAME=timer_name))
+            result = {
+                "ok": completed.returncode == 0,
+                "returncode": completed.returncode,
+                "stdout": completed.stdout[-4000:],
+                "stderr": completed.stderr[-4000:]
+            }
+        elif action_type == 'file':
+            # Non-blocking, so a FIFO without a reader fails instead of hanging
+            flags = os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, 'O_NONBLOCK', 0)
+            fd = os.open(action_path, flags, 0o644)
+            try:
+                os.write(fd, f"{datetime.now().isoformat(timespec='seconds')} {timer_name} finished\n".encode())
+            finally:
+                os.close(fd)
+            result = {"ok": True}
+        else:
+            result = {"ok": False, "error": f"unknown action type '{action_type}'"}
+    except subprocess.TimeoutExpired:
+        result = {"ok": False, "error": f"timed out after {timeout} s"}
+    except (OSError, ValueError) as error:
+        result = {"ok": False, "error": str(error)}
+    result["seconds"] = time.monotonic() - started
+    return result
+
+
+class ActionRunner:
+    """Runs timer completion actions in a bounded process pool
+
+    At most max_workers actions run at a time. Further ones wait in a queue of
+    at most max_pending and are rejected beyond that, so a burst of completing
+    timers never blocks the scheduler or the UI. Results are kept in `results`
+    and passed to on_result, which is called from a pool thread.
+    """
+    MAX_WORKERS = 4
+    MAX_PENDING = 256
+    TIMEOUT = 30.0
+
+    def __init__(self, on_result=None, max_workers=MAX_WORKERS, max_pending=MAX_PENDING, timeout=TIMEOUT):
+        self.on_result = on_result
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.results = collections.deque(maxlen=100)
+        self._pool = None  # Started on the first action
+        self._running = 0
+        self._pending = collections.deque()
+        self._lock = threading.Lock()
+
+
+    def on_engine_event(self, event, timers):
+        if event == 'finished':
+            for timer in timers:
+                if timer.action_type != 'alert':
+                    self.submit(timer)
+
+
+    def submit(self, timer):
+        job = (timer.id, timer.name, timer.action_type, timer.action_path)
+        with self._lock:
+            if self._running < self.max_workers:
+                self._running += 1
+            elif len(self._pending) < self.max_pending:
+                self._pending.append(job)
+                return True
+            else:
+                job = None
+        
+        if job is None:
+            self._report((timer.id, timer.name, timer.action_type, timer.action_path),
+                         {"ok": False, "error": "too many pending actions"})
+            return False
+        self._start(job)
+        return True
+
+
+    def shutdown(self):
+        with self._lock:
+            self._pending.clear()
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+    def _start(self, job):
+        with self._lock:
+            if self._pool is None:
+                import concurrent.futures
+                import multiprocessing
+                # Spawned workers do not inherit Tk or the scheduler threads
+                self._pool = concurrent.futures.ProcessPoolExecutor(
+                    self.max_workers, mp_context=multiprocessing.get_context('spawn'))
+            pool = self._pool
+        try:
+            future = pool.submit(run_timer_action, job[2], job[3], job[1], self.timeout)
+        except RuntimeError as error:  # Pool shut down or broken
+            self._done(job, None, error)
+            return
+        future.add_done_callback(lambda future: self._done(job, future))
+
+
+    def _done(self, job, future, error=None):
+        result = None
+        try:
+            result = future.result() if future is not None else None
+        except Exception as exception:
+            error = exception
+        if result is None:
+            result = {"ok": False, "error": repr(error)}
+        
+        with self._lock:
+            next_job = self._pending.popleft() if self._pending else None
+            if next_job is None:
+                self._running -= 1
+        self._report(job, result)
+        if next_job is not None:
+            self._start(next_job)
+
+
+    def _report(self, job, result):
+        result.update(timer_id=job[0], name=job[1], action=job[2], path=job[3])
+        self.results.append(result)
+        if self.on_result:
+            self.on_result(result)
+
+
+class ControlServer:
+    """Local control API: newline-delimited JSON over a Unix socket
+
+    Each request line is one command object or a JSON array of commands (a
+    batch). Replies come back one line per request line and in order, so
+    clients may pipeline requests without waiting, e.g.
+
+        printf '{"op": "add", "timers": [{"name": "Tea", "duration": 180}]}\\n' |
+            nc -U ~/.local/share/smart_timer/control.sock
+
+    An 'add' command is validated as a whole and added as one engine batch,
+    so creating 500 timers is one 'added' event and one list refresh. Where
+    Unix sockets are unavailable a loopback TCP port is used instead; it is
+    written to control.json with a token that must be each connection's
+    first line.
+    """
+    SOCKET_NAME = 'control.sock'
+    INFO_NAME = 'control.json'
+
+    def __init__(self, engine, groups=None, directory=None, dispatch=None):
+        self.engine = engine
+        self.groups = groups if groups is not None else {}
+        self.directory = Path(directory) if directory else user_data_dir()
+        # Runs each command; the default runs it on the connection's thread
+        self.dispatch = dispatch or (lambda function: function())
+        self.address = None
+        self.token = None
+        self._socket = None
+        self.commands = {
+            'ping': lambda command: "pong",
+            'add': self.add,
+            'list': self.list,
+            'get': self.get,
+            'stop': self.stop,
+            'start_group': self.start_group,
+            'stats': lambda command: self.engine.stats.snapshot()
+        }
+
+
+    def start(self):
+        import socket
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if hasattr(socket, 'AF_UNIX'):
+            path = self.directory / self.SOCKET_NAME
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(str(path))
+                raise OSError(f"another Smart Timer is listening on {path}")
+            except (FileNotFoundError, ConnectionRefusedError):
+                path.unlink(missing_ok=True)  # Left behind by a crashed session
+            finally:
+                probe.close()
+            
+            server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            old_umask = os.umask(0o177)  # Only the owner may connect
+            try:
+                server.bind(str(path))
+            finally:
+                os.umask(old_umask)
+            self.address = str(path)
+        else:
+            import secrets
+            server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server.bind(('127.0.0.1', 0))
+            self.address = server.getsockname()
+            self.token = secrets.token_hex(16)
+            (self.directory / self.INFO_NAME).write_text(
+                json.dumps({"port": self.address[1], "token": self.token}), encoding='utf-8')
+        server.listen()
+        self._socket = server
+        threading.Thread(target=self._accept, daemon=True).start()
+        return self.address
+
+
+    def close(self):
+        if self._socket is None:
+            return
+        self._socket.close()
+        self._socket = None
+        if self.token is None:
+            Path(self.address).unlink(missing_ok=True)
+        else:
+            (self.directory / self.INFO_NAME).unlink(missing_ok=True)
+
+
+    def _accept(self):
+        while self._socket is not None:
+            try:
+                connection, _ = self._socket.accept()
+            except OSError:
+                return  # Closed
+            threading.Thread(target=self._serve, args=(connection,), daemon=True).start()
+
+
+    def _serve(self, connection):
+        with connection, connection.makefile('rb') as reader:
+            try:
+                if self.token is not None and reader.readline().strip().decode() != self.token:
+                    return
+                for line in reader:
+                    if line.strip():
+                        reply = self.handle(line)
+                        connection.sendall(json.dumps(reply, separators=(',', ':')).encode() + b'\n')
+            except (OSError, UnicodeDecodeError):
+                pass  # Client went away
+
+
+    def handle(self, line):
+        """Reply to one request line"""
+        try:
+            request = json.loads(line)
+        except ValueError as error:
+            return {"ok": False, "error": f"invalid JSON: {error}"}
+        if isinstance(request, list):
+            return [self.execute(command) for command in request]
+        return self.execute(request)
+
+
+    def execute(self, command):
+        if not isinstance(command, dict):
+            return {"ok": False, "error": "command must be an object"}
+        op = command.get('op')
+        handler = self.commands.get(op) if isinstance(op, str) else None
+        if handler is None:
+            reply = {"ok": False, "error": f"unknown op {op!r}"}
+        else:
+            # A bad request gets an error reply; it must never end the connection
+            try:
+                reply = {"ok": True, "result": self.dispatch(lambda: handler(command))}
+            except Exception as error:
+                reply = {"ok": False, "error": str(error) or type(error).__name__}
+        if 'id' in command:
+            reply['id'] = command['id']
+        return reply
+
+
+    @staticmethod
+    def describe(timer, now):
+        record = timer_record(timer)
+        record['active'] = timer.active
+        record['remaining'] = timer.remaining_ns(now) / 1_000_000_000
+        return record
+
+
+    def add(self, command):
+        # Validate everything first so a bad record adds nothing
+        now = time.monotonic_ns()
+        timers = []
+        if not isinstance(command['timers'], list):
+            raise ValueError("'timers' must be a list")
+        for index, record in enumerate(command['timers']):
+            try:
+                if not isinstance(record, dict):
+                    raise ValueError("not an object")
+                timers.append(timer_from_import(record, now, self.engine.tz_manager))
+            except (ValueError, KeyError, TypeError, OverflowError) as error:
+                raise ValueError(f"timers[{index}]: {error}") from None
+        self.engine.add_many(timers)
+        return [timer.id for timer in timers]
+
+
+    def list(self, command):
+        now = time.monotonic_ns()
+        timers = self.engine.list(command.get('sort', 'time'), command.get('start', 0), command.get('stop'))
+        return [self.describe(timer, now) for timer in timers]
+
+
+    def get(self, command):
+        timer = self.engine.get(command['timer'])
+        if timer is None:
+            raise ValueError(f"no timer {command['timer']}")
+        return self.describe(timer, time.monotonic_ns())
+
+
+    def stop(self, command):
+        # Validate every id first so a bad one stops nothing
+        timer_ids = command.get('timers', [])
+        if not isinstance(timer_ids, list) or not all(
+                isinstance(timer_id, int) and not isinstance(timer_id, bool) for timer_id in timer_ids):
+            raise ValueError("'timers' must be a list of timer ids")
+        if 'name' in command:
+            if not isinstance(command['name'], str):
+                raise ValueError("'name' must be a string")
+            timer_ids = timer_ids + [timer.id for timer in self.engine.find(command['name'])]
+        return [timer.id for timer in self.engine.stop_many(timer_ids)]
+
+
+    def start_group(self, command):
+        name = command.get('name')
+        timer_configs = command.get('timers') or self.groups.get(name)
+        if not timer_configs:
+            raise ValueError(f"no timer group {name!r}")
+        timer_configs = [group_config_from_import(config) for config in timer_configs]
+        timers = self.engine.start_group(timer_configs, command.get('sequential', False),
+                                         int(command.get('repeat', 1)), name)
+        return [timer.id for timer in timers]
 
 
 class TimeZoneManager:
@@ -165,128 +2036,494 @@ class TimeZoneManager:
             "Germany (Berlin)": "Europe/Berlin",
             "China (Beijing)": "Asia/Shanghai"
         }
+        self._tzinfos = {}  # Display name -> resolved tzinfo
+        self._offsets = {}  # Display name -> (offset, tzinfo, valid from, valid until)
     
 
     def get_timezone_names(self):
         return list(self.common_timezones.keys())
     
 
+    def get_tzinfo(self, timezone_name):
+        """Return the cached tzinfo for a display name, None for local time"""
+        tz = self._tzinfos.get(timezone_name)
+        if tz is None:
+            tz_str = self.common_timezones.get(timezone_name)
+            if tz_str is None:
+                return None
+            tz = load_pytz().timezone(tz_str)
+            self._tzinfos[timezone_name] = tz
+        return tz
+
+
+    def utc_offset(self, timezone_name, utc_dt):
+        """Return (offset, tzinfo) of a zone at naive UTC `utc_dt`
+
+        The result is cached until the zone's next DST transition, so repeated
+        conversions only pay for a range check.
+        """
+        cached = self._offsets.get(timezone_name)
+        if cached and cached[2] <= utc_dt < cached[3]:
+            return cached[0], cached[1]
+        
+        tz = self.get_tzinfo(timezone_name)
+        # pytz keeps the transition table of DST-aware zones in this attribute
+        transitions = getattr(tz, '_utc_transition_times', None)
+        if transitions:
+            index = bisect.bisect_right(transitions, utc_dt)
+            valid_from = transitions[index - 1] if index else datetime.min
+            valid_until = transitions[index] if index < len(transitions) else datetime.max
+        else:
+            valid_from, valid_until = datetime.min, datetime.max
+        
+        zone_time = tz.fromutc(utc_dt.replace(tzinfo=tz))
+        offset, zone = zone_time.utcoffset(), zone_time.tzinfo
+        self._offsets[timezone_name] = (offset, zone, valid_from, valid_until)
+        return offset, zone
+
+
+    def from_utc(self, utc_dt, timezone_name):
+        """Convert naive UTC to an aware datetime in the zone (naive local for local time)"""
+        if self.common_timezones.get(timezone_name) is None:
+            return utc_dt.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+        offset, zone = self.utc_offset(timezone_name, utc_dt)
+        return (utc_dt + offset).replace(tzinfo=zone)
+
+
     def get_current_time(self, timezone_name):
-        tz_str = self.common_timezones.get(timezone_name)
-        if tz_str is None:  # Local time
+        if self.common_timezones.get(timezone_name) is None:  # Local time
             return datetime.now()
-        else:
-            tz = pytz.timezone(tz_str)
-            return datetime.now(pytz.UTC).astimezone(tz)
+        return self.from_utc(datetime.now(timezone.utc).replace(tzinfo=None), timezone_name)
     
 
     def convert_to_local(self, dt, from_timezone_name):
-        if from_timezone_name == "Local Time" or dt.tzinfo is not None:
+        """Convert a wall time in the given zone to a naive local datetime"""
+        if dt.tzinfo is not None:
+            return dt.astimezone().replace(tzinfo=None)
+        if self.common_timezones.get(from_timezone_name) is None:
             return dt
         
-        tz_str = self.common_timezones.get(from_timezone_name)
-        if tz_str:
-            tz = pytz.timezone(tz_str)
-            dt = tz.localize(dt)
-            return dt.astimezone(pytz.tzlocal())
-        return dt
+        dt = self.get_tzinfo(from_timezone_name).localize(dt)
+        return dt.astimezone().replace(tzinfo=None)
+
+
+    def to_utc(self, dt, timezone_name):
+        """Naive UTC datetime of a naive wall time in the zone
+
+        A time repeated when clocks go back means its first occurrence; a time
+        skipped when they go forward lands the same distance past the jump.
+        """
+        tz = self.get_tzinfo(timezone_name)
+        if tz is None:
+            aware = dt.astimezone()
+        else:
+            aware = tz.normalize(tz.localize(dt, is_dst=True))
+            if aware.replace(tzinfo=None) != dt:  # Inside a DST gap
+                aware = tz.localize(dt, is_dst=False)
+        return aware.astimezone(timezone.utc).replace(tzinfo=None)
 
 
     def convert_from_local(self, dt, to_timezone_name):
-        if to_timezone_name == "Local Time":
-            return dt
+        return self.convert_many_from_local([dt], to_timezone_name)[0]
+
+
+    def convert_many_from_local(self, datetimes, to_timezone_name):
+        """Convert naive local datetimes to the zone with a single zone lookup"""
+        if self.common_timezones.get(to_timezone_name) is None:
+            return list(datetimes)
         
-        tz_str = self.common_timezones.get(to_timezone_name)
-        if tz_str:
-            target_tz = pytz.timezone(tz_str)
-            local_tz = pytz.tzlocal()
-            
-            # If dt is naive, assume it's in local time
-            if dt.tzinfo is None:
-                dt = local_tz.localize(dt)
-            
-            return dt.astimezone(target_tz)
-        return dt
+        return self.convert_many_from_utc(
+            [dt.astimezone(timezone.utc).replace(tzinfo=None) for dt in datetimes],
+            to_timezone_name)
 
 
-class AlarmSound:
-    def __init__(self):
-        pygame.mixer.init()
-        self.sounds = {
-            'beep': self.generate_beep_sound(),
-            'melody': self.generate_melody_sound(),
-            'gentle': self.generate_gentle_sound()
-        }
-        self.current_sound = None
-        self.playing = False
+    def convert_many_from_utc(self, utc_datetimes, to_timezone_name):
+        from_utc = self.from_utc
+        return [from_utc(dt, to_timezone_name) for dt in utc_datetimes]
 
 
-    def generate_beep_sound(self):
-        return self.generate_sound(440.0, 2.0)  # A4 note, 2 beeps per second
+def user_cache_dir():
+    """Per-user cache directory for Smart Timer"""
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or Path.home() / 'AppData' / 'Local'
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'smart_timer'
 
 
-    def generate_melody_sound(self):
-        return self.generate_sound(523.25, 1.5)  # C5 note, slower beeps
+def user_data_dir():
+    """Per-user directory for Smart Timer's saved timers and groups
 
+    SMART_TIMER_DATA_DIR overrides it, e.g. for benchmarks or a second profile.
+    """
+    if os.environ.get('SMART_TIMER_DATA_DIR'):
+        return Path(os.environ['SMART_TIMER_DATA_DIR'])
+    if os.name == 'nt':
+        base = os.environ.get('APPDATA') or Path.home() / 'AppData' / 'Roaming'
+    else:
+        base = os.environ.get('XDG_DATA_HOME') or Path.home() / '.local' / 'share'
+    return Path(base) / 'smart_timer'
 
-    def generate_gentle_sound(self):
-        return self.generate_sound(392.0, 1.0)  # G4 note, gentle beeps
 
+class SoundCache:
+    """Rendered PCM stored on disk under a hash of the parameters that produced it"""
+    MAX_BYTES = 32 * 1024 * 1024
 
-    def generate_sound(self, frequency, beep_freq):
-        duration = 3.0
-        sample_rate = 44100
-        samples = int(duration * sample_rate)
-        
-        buffer = []
-        for i in range(samples):
-            t = i / sample_rate
-            amplitude = math.sin(2 * math.pi * beep_freq * t) * 0.5 + 0.5
-            value = 32767 * amplitude * math.sin(2 * math.pi * frequency * t)
-            buffer.append(int(value))
-        
-        import wave
-        import struct
-        
-        filename = f"sound_{frequency}_{beep_freq}.wav"
-        with wave.open(filename, "w") as wav_file:
-            wav_file.setnchannels(1)
-            wav_file.setsampwidth(2)
-            wav_file.setframerate(sample_rate)
-            for value in buffer:
-                data = struct.pack('<h', value)
-                wav_file.writeframes(data)
-        
-        return pygame.mixer.Sound(filename)
+    def __init__(self, directory=None, max_bytes=MAX_BYTES):
+        self.directory = Path(directory) if directory else user_cache_dir() / 'sounds'
+        self.max_bytes = max_bytes
 
 
-    def play(self, sound_type='beep'):
-        if self.playing:
-            self.stop()
-        self.current_sound = self.sounds.get(sound_type, self.sounds['beep'])
-        self.current_sound.play(-1)
-        self.playing = True
+    @staticmethod
+    def key(*params):
+        return hashlib.sha1(repr(params).encode()).hexdigest()
 
 
-    def stop(self):
-        if self.playing and self.current_sound:
-            self.current_sound.stop()
-            self.playing = False
+    def path_for(self, key):
+        return self.directory / f"{key}.pcm"
+
+
+    def get(self, key):
+        path = self.path_for(key)
+        try:
+            data = path.read_bytes()
+        except OSError:
+            return None
+        try:
+            os.utime(path)  # Mark as recently used for LRU eviction
+        except OSError:
+            pass
+        return data
+
+
+    def map(self, key):
+        """Memory-map an entry read-only instead of reading it, or None if missing"""
+        path = self.path_for(key)
+        try:
+            with open(path, 'rb') as cached_file:
+                data = mmap.mmap(cached_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):  # ValueError: empty file
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return data
+
+
+    def put(self, key, data):
+        # The cache is best effort, a read-only home directory just means no caching
+        path = self.path_for(key)
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            temp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            temp_path.write_bytes(data)
+            os.replace(temp_path, path)
+            self.evict()
+        except OSError:
+            pass
+
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".pcm"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        
+        total = sum(size for _, size, _ in entries)
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+class AlarmSound:
+    """Alarm sounds mixed on a fixed pool of mixer channels
+
+    Every alarm gets its own channel, keyed (usually by timer id), so a new
+    alarm does not cut off an older one; older alarms are ducked instead.
+    When the pool is full the oldest alarm gives up its channel. Alarms end
+    on their own after MAX_PLAY_MS, fading out when an `after` scheduler is
+    available.
+
+    Besides the synthesized presets, WAV/OGG files can be registered as
+    sound types. A file is decoded into the mixer format once and the PCM is
+    kept in a separate cache that is memory-mapped on later loads.
+    """
+    SAMPLE_RATE = 44100
+    DURATION = 3.0
+    CHANNELS = 8  # Alarms that can sound at once
+    MAX_PLAY_MS = 30_000
+    FADE_MS = 1500
+    DUCK_VOLUME = 0.35  # Volume of older alarms while a newer one plays
+    FILE_CACHE_BYTES = 256 * 1024 * 1024  # Decoded sound files can be large
+    SOUND_PRESETS = {
+        'beep': (440.0, 2.0),     # A4 note, 2 beeps per second
+        'melody': (523.25, 1.5),  # C5 note, slower beeps
+        'gentle': (392.0, 1.0)    # G4 note, gentle beeps
+    }
+
+    def __init__(self, cache=None, after=None, registry_path=None):
+        self.cache = cache or SoundCache()
+        self.file_cache = SoundCache(self.cache.directory / 'files', self.FILE_CACHE_BYTES)
+        self.registry_path = Path(registry_path) if registry_path else user_data_dir() / 'sounds.json'
+        self.custom_sounds = self.load_registry()  # Sound type -> audio file path
+        self.after = after  # after(ms, callback, *args) of the UI loop, for fade-outs
+        self.sounds = {}  # Loaded on first play of each sound type
+        self.channels = []  # The channel pool, opened with the mixer
+        self.active = {}  # Alarm key -> (channel, play number), oldest first
+        self._plays = itertools.count()
+        self.ready = False
+        self._init_lock = threading.Lock()
+
+
+    def init_mixer(self):
+        """Import pygame and open the mixer; safe to call from any thread"""
+        with self._init_lock:
+            if self.ready:
+                return
+            pygame = load_pygame()
+            pygame.mixer.init(frequency=self.SAMPLE_RATE, size=-16, channels=1)
+            # The mixer may not grant the requested format, so render for what we got
+            self.sample_rate, self.sample_size, self.output_channels = pygame.mixer.get_init()
+            pygame.mixer.set_num_channels(self.CHANNELS)
+            self.channels = [pygame.mixer.Channel(index) for index in range(self.CHANNELS)]
+            self.ready = True
+
+
+    def load_registry(self):
+        try:
+            with open(self.registry_path, encoding='utf-8') as registry_file:
+                custom_sounds = json.load(registry_file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as error:
+            print(f"Ignoring unreadable sound registry: {error}", file=sys.stderr)
+            return {}
+        custom_sounds = {sound_type: path for sound_type, path in custom_sounds.items()
+                         if sound_type not in self.SOUND_PRESETS}
+        for sound_type in custom_sounds:
+            SOUND_TYPES.code(sound_type)
+        return custom_sounds
+
+
+    def add_custom_sound(self, path, sound_type=None):
+        """Register an audio file as a sound type and return the type name
+
+        The file is decoded right away, so an unsupported file raises here.
+        """
+        path = os.path.abspath(path)
+        if sound_type in self.SOUND_PRESETS:
+            raise ValueError(f"'{sound_type}' is a built-in sound")
+        if sound_type is None:
+            sound_type = base = Path(path).stem
+            number = 2
+            while sound_type in self.SOUND_PRESETS or (
+                    sound_type in self.custom_sounds and self.custom_sounds[sound_type] != path):
+                sound_type = f"{base} {number}"
+                number += 1
+        
+        self.sounds[sound_type] = self.load_file_sound(path)
+        self.custom_sounds[sound_type] = path
+        SOUND_TYPES.code(sound_type)
+        
+        self.registry_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.registry_path.with_suffix('.tmp')
+        temp_path.write_text(json.dumps(self.custom_sounds, indent=2), encoding='utf-8')
+        os.replace(temp_path, self.registry_path)
+        return sound_type
+
+
+    def get_sound(self, sound_type):
+        self.init_mixer()
+        sound = self.sounds.get(sound_type)
+        if sound is not None:
+            return sound
+        
+        if sound_type in self.SOUND_PRESETS:
+            sound = self.generate_sound(*self.SOUND_PRESETS[sound_type])
+        elif sound_type in self.custom_sounds:
+            try:
+                sound = self.load_file_sound(self.custom_sounds[sound_type])
+            except Exception as error:  # Moved, deleted or undecodable file
+                print(f"Cannot load sound '{sound_type}': {error}", file=sys.stderr)
+                return self.get_sound('beep')
+        else:
+            return self.get_sound('beep')
+        self.sounds[sound_type] = sound
+        return sound
+
+
+    def load_file_sound(self, path):
+        """Sound for an audio file, decoded and resampled only on a cache miss"""
+        self.init_mixer()
+        stat = os.stat(path)
+        key = SoundCache.key('file', path, stat.st_size, stat.st_mtime_ns,
+                             self.sample_rate, self.sample_size, self.output_channels)
+        samples = self.file_cache.map(key)
+        if samples is not None:
+            try:
+                return pygame.mixer.Sound(buffer=samples)
+            finally:
+                samples.close()
+        
+        # pygame decodes and converts the file to the mixer's format
+        sound = pygame.mixer.Sound(file=path)
+        self.file_cache.put(key, sound.get_raw())
+        return sound
+
+
+    def generate_sound(self, frequency, beep_freq):
+        key = SoundCache.key(frequency, beep_freq, self.DURATION,
+                             self.sample_rate, self.sample_size, self.output_channels)
+        expected_size = int(self.DURATION * self.sample_rate) * self.output_channels * 2
+        
+        samples = self.cache.get(key)
+        if samples is None or len(samples) != expected_size:
+            samples = self.render_samples(frequency, beep_freq, self.DURATION,
+                                          self.sample_rate, self.output_channels)
+            self.cache.put(key, samples)
+        return pygame.mixer.Sound(buffer=samples)
+
+
+    @staticmethod
+    def render_samples(frequency, beep_freq, duration, sample_rate, channels=1):
+        """Return native-endian 16-bit PCM for a sine tone pulsing at beep_freq"""
+        count = int(duration * sample_rate)
+        
+        np = load_numpy()
+        if np is not None:
+            t = np.arange(count, dtype=np.float64) / sample_rate
+            amplitude = np.sin(2 * np.pi * beep_freq * t) * 0.5 + 0.5
+            wave = (32767 * amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.int16)
+            if channels > 1:
+                wave = np.repeat(wave, channels)
+            return wave.tobytes()
+        
+        # Pure Python fallback: one comprehension straight into a typed array
+        sin = math.sin
+        carrier_step = 2 * math.pi * frequency / sample_rate
+        beep_step = 2 * math.pi * beep_freq / sample_rate
+        wave = array('h', [int(32767 * (sin(beep_step * i) * 0.5 + 0.5) * sin(carrier_step * i))
+                           for i in range(count)])
+        if channels > 1:
+            wave = array('h', [value for value in wave for _ in range(channels)])
+        return wave.tobytes()
+
+
+    @property
+    def playing(self):
+        self._prune()
+        return bool(self.active)
+
+
+    def play(self, sound_type='beep', key=None):
+        """Start an alarm on its own channel and return its key"""
+        sound = self.get_sound(sound_type)
+        play_number = next(self._plays)
+        key = ('alarm', play_number) if key is None else key
+        self._prune()
+        if key in self.active:
+            self.active.pop(key)[0].stop()
+        
+        busy = [channel for channel, _ in self.active.values()]
+        channel = next((channel for channel in self.channels if channel not in busy), None)
+        if channel is None:
+            # Pool exhausted: the oldest alarm makes room
+            channel = self.active.pop(next(iter(self.active)))[0]
+            channel.stop()
+        for other, _ in self.active.values():
+            other.set_volume(self.DUCK_VOLUME)
+        
+        channel.set_volume(1.0)
+        channel.play(sound, loops=-1, maxtime=self.MAX_PLAY_MS)
+        self.active[key] = (channel, play_number)
+        if self.after is not None:
+            self.after(self.MAX_PLAY_MS - self.FADE_MS, self._fade, key, play_number)
+        return key
+
+
+    def _fade(self, key, play_number):
+        entry = self.active.get(key)
+        if entry is not None and entry[1] == play_number:
+            entry[0].fadeout(self.FADE_MS)
+
+
+    def _prune(self):
+        # Forget alarms that ran out, and bring the newest one back to full volume
+        for key, (channel, _) in list(self.active.items()):
+            if not channel.get_busy():
+                del self.active[key]
+        if self.active:
+            next(reversed(self.active.values()))[0].set_volume(1.0)
+
+
+    def stop(self, key=None):
+        """Stop one alarm, or all of them without a key"""
+        if key is None:
+            for channel, _ in self.active.values():
+                channel.stop()
+            self.active.clear()
+            return
+        entry = self.active.pop(key, None)
+        if entry is not None:
+            entry[0].stop()
+            self._prune()
 
 
     def cleanup(self):
         self.stop()
-        for filename in os.listdir():
-            if filename.startswith("sound_") and filename.endswith(".wav"):
-                try:
-                    os.remove(filename)
-                except:
-                    pass
+        if self.ready:
+            pygame.mixer.quit()
+
+
+class StartupProfiler:
+    """Collects the duration of each startup phase"""
+    def __init__(self, start):
+        self.last = start
+        self.phases = []
+        self.enabled = bool(os.environ.get('SMART_TIMER_PROFILE')) or '--profile-startup' in sys.argv
+
+
+    def mark(self, phase):
+        """Record the time since the previous mark as `phase`"""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+
+    def record(self, phase, seconds):
+        # For phases that run in the background, outside the mark() sequence
+        self.phases.append((phase, seconds))
+
+
+    def report(self):
+        lines = ["Startup phases:"]
+        for phase, seconds in self.phases:
+            lines.append(f"  {phase:<12} {seconds * 1000:8.1f} ms")
+        return "\n".join(lines)
 
 
 class ScrollableFrame(ttk.Frame):
+    """Vertically scrolling frame whose panels can be built lazily
+
+    Panels registered with add_lazy are built the first time any part of
+    them is scrolled into view. The mouse wheel is handled by one binding
+    shared by all instances, so widgets added later need no bindings.
+    """
+    _instances = {}  # Widget path -> ScrollableFrame, for the shared wheel binding
+
     def __init__(self, container, *args, **kwargs):
         super().__init__(container, *args, **kwargs)
+        self.lazy_panels = []  # (widget, build) not revealed yet
+        self._reveal_pending = False
         
         # Create a canvas and scrollbar
         self.canvas = tk.Canvas(self, bg=COLORS['background'], highlightthickness=0)
@@ -294,10 +2531,7 @@ class ScrollableFrame(ttk.Frame):
         
         # Create the scrollable frame inside the canvas
         self.scrollable_frame = ttk.Frame(self.canvas)
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-        )
+        self.scrollable_frame.bind("<Configure>", self.on_frame_configure)
         
         # Create a window inside the canvas for the scrollable frame
         self.canvas_frame = self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
@@ -313,7 +2547,7 @@ class ScrollableFrame(ttk.Frame):
         self.scrollbar.grid(row=0, column=1, sticky="ns")
         
         # Configure canvas scrolling
-        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.canvas.configure(yscrollcommand=self.on_yscroll)
         
         # Configure grid weights
         self.grid_columnconfigure(0, weight=1)
@@ -323,42 +2557,298 @@ class ScrollableFrame(ttk.Frame):
     def on_canvas_configure(self, event):
         # Update the width of the canvas window when the canvas is resized
         self.canvas.itemconfig(self.canvas_frame, width=event.width)
+        self.schedule_reveal()
 
 
-    def bind_mouse_wheel(self):
-        # Bind mouse wheel to all relevant widgets
-        def _on_mousewheel(event):
-            self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
-        
-        # Bind to canvas
-        self.canvas.bind_all("<MouseWheel>", _on_mousewheel)
+    def on_frame_configure(self, event):
+        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        self.schedule_reveal()
+
+
+    def on_yscroll(self, first, last):
+        self.scrollbar.set(first, last)
+        self.schedule_reveal()
+
+
+    def add_lazy(self, widget, build):
+        """Call build() the first time `widget` is scrolled into view"""
+        self.lazy_panels.append((widget, build))
+        self.schedule_reveal()
+
+
+    def schedule_reveal(self):
+        if self.lazy_panels and not self._reveal_pending:
+            self._reveal_pending = True
+            self.after_idle(self.reveal_visible)
+
+
+    def reveal_visible(self):
+        self._reveal_pending = False
+        height = self.canvas.winfo_height()
+        if height <= 1:
+            return  # Not laid out yet, <Configure> will bring us back
         
+        top = self.canvas.canvasy(0)
+        bottom = top + height
+        frame_top = self.scrollable_frame.winfo_rooty()
+        visible, self.lazy_panels = self.lazy_panels, []
+        for widget, build in visible:
+            y = widget.winfo_rooty() - frame_top
+            if y < bottom and y + widget.winfo_height() > top:
+                build()  # May register nested panels, checked on the next pass
+            else:
+                self.lazy_panels.append((widget, build))
+
 
-        # Bind to scrollable frame and all its children
-        def bind_recursive(widget):
-            widget.bind("<MouseWheel>", _on_mousewheel)
-            for child in widget.winfo_children():
-                bind_recursive(child)
+    def bind_mouse_wheel(self):
+        # One binding on the "all" tag serves every instance and every widget
+        # created later; the handler finds the frame from the widget's path
+        if not ScrollableFrame._instances:
+            for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                self.bind_all(sequence, ScrollableFrame._on_mousewheel, add='+')
+        ScrollableFrame._instances[str(self)] = self
+        self.bind("<Destroy>", self._on_destroy)
+
+
+    def _on_destroy(self, event):
+        if event.widget is self:
+            ScrollableFrame._instances.pop(str(self), None)
+
+
+    @staticmethod
+    def _on_mousewheel(event):
+        path = str(event.widget)
+        for frame_path, frame in ScrollableFrame._instances.items():
+            if path == frame_path or path.startswith(frame_path + '.'):
+                if event.num in (4, 5):  # X11 reports the wheel as buttons
+                    units = -1 if event.num == 4 else 1
+                else:
+                    units = int(-1 * (event.delta / 120))
+                frame.canvas.yview_scroll(units, "units")
+                return
+
+
+class NotificationCenter:
+    """Shows finished timers in one non-modal panel with one alarm
+
+    Timers finishing within BATCH_WINDOW_MS of each other are delivered as a
+    single batch. Each timer can be acknowledged on its own; the alarm stops
+    once everything is acknowledged.
+    """
+    BATCH_WINDOW_MS = 250
+    MAX_ROWS = 20  # Rows shown at once, the rest are summarized
+
+    def __init__(self, root, alarm):
+        self.root = root
+        self.alarm = alarm
+        self.window = None
+        self.unacknowledged = {}  # Timer id -> (Timer, finish deadline), oldest first
+        self.rows = {}  # Timer id -> row frame, for the timers on screen
+        self.alarm_keys = {}  # Timer id -> key of the alarm it shares
+        self.alarm_users = {}  # Alarm key -> unacknowledged timer ids sharing it
+        self._alarm_numbers = itertools.count()
+        self._batch = []
+        self._flush_id = None
+        self._audio_error = None  # Last audio failure, reported once
+
+
+    def notify(self, timers):
+        """Queue finished timers; must be called on the Tk thread"""
+        # Recurring timers are already re-armed by now, so they finished "now"
+        now = time.monotonic_ns()
+        self._batch.extend((timer, min(timer.deadline, now)) for timer in timers)
+        if self._flush_id is None:
+            self._flush_id = self.root.after(self.BATCH_WINDOW_MS, self._flush)
+
+
+    def _flush(self):
+        self._flush_id = None
+        batch, self._batch = self._batch, []
+        if not batch:
+            return
         
-        bind_recursive(self.scrollable_frame)
+        # One alarm per sound type in the batch, each on its own mixer channel,
+        # kept until every timer sharing it is acknowledged
+        batch_keys = {}  # Sound type -> alarm key
+        for timer, finished in batch:
+            if timer.id in self.unacknowledged:
+                self._release_alarm(timer.id)  # Recurring timer finished again
+            self.unacknowledged[timer.id] = (timer, finished)
+            key = batch_keys.get(timer.sound_type)
+            if key is None:
+                key = batch_keys[timer.sound_type] = ('notification', next(self._alarm_numbers))
+                self.alarm_users[key] = set()
+                self._play(timer.sound_type, key)
+            self.alarm_keys[timer.id] = key
+            self.alarm_users[key].add(timer.id)
+        
+        self._ensure_window()
+        self._update_rows()
+        self.window.deiconify()
+        self.window.lift()
+
+
+    def _play(self, sound_type, key):
+        # Without audio the panel is still shown, just silently
+        try:
+            self.alarm.play(sound_type, key=key)
+        except Exception as error:
+            if str(error) != self._audio_error:
+                self._audio_error = str(error)
+                print(f"Cannot play alarm: {error}", file=sys.stderr)
+
+
+    def _ensure_window(self):
+        if self.window is not None:
+            return
+        self.window = tk.Toplevel(self.root)
+        self.window.title("Timers Finished")
+        self.window.configure(bg=COLORS['background'])
+        self.window.transient(self.root)
+        self.window.protocol("WM_DELETE_WINDOW", self.acknowledge_all)
+        
+        frame = ttk.Frame(self.window, padding="15")
+        frame.pack(fill=tk.BOTH, expand=True)
+        self.rows_frame = ttk.Frame(frame)
+        self.rows_frame.pack(fill=tk.BOTH, expand=True)
+        self.more_label = ttk.Label(frame, text="")
+        self.more_label.pack(anchor="w", pady=(5, 0))
+        
+        buttons = ttk.Frame(frame)
+        buttons.pack(fill=tk.X, pady=(10, 0))
+        ttk.Button(buttons, text="Stop Alarm", command=self.alarm.stop,
+                  style='Warning.TButton').pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Acknowledge All", command=self.acknowledge_all,
+                  style='Primary.TButton').pack(side=tk.RIGHT, padx=5)
+
+
+    def _update_rows(self):
+        # Show the oldest MAX_ROWS unacknowledged timers
+        for timer_id, (timer, finished) in self.unacknowledged.items():
+            if len(self.rows) >= self.MAX_ROWS:
+                break
+            if timer_id in self.rows:
+                continue
+            row = ttk.Frame(self.rows_frame)
+            row.pack(fill=tk.X, pady=2)
+            finished_at = deadline_to_datetime(finished).strftime('%H:%M:%S')
+            ttk.Label(row, text=f"'{timer.name}' finished at {finished_at}").pack(side=tk.LEFT)
+            ttk.Button(row, text="Acknowledge",
+                      command=lambda timer_id=timer_id: self.acknowledge(timer_id)).pack(side=tk.RIGHT)
+            self.rows[timer_id] = row
+        
+        hidden = len(self.unacknowledged) - len(self.rows)
+        self.more_label.config(text=f"... and {hidden} more" if hidden else "")
+
+
+    def _release_alarm(self, timer_id):
+        # Stop a shared alarm once its last timer is acknowledged
+        key = self.alarm_keys.pop(timer_id, None)
+        users = self.alarm_users.get(key)
+        if users is None:
+            return
+        users.discard(timer_id)
+        if not users:
+            del self.alarm_users[key]
+            self.alarm.stop(key)
+
+
+    def acknowledge(self, timer_id):
+        self.unacknowledged.pop(timer_id, None)
+        self._release_alarm(timer_id)
+        row = self.rows.pop(timer_id, None)
+        if row is not None:
+            row.destroy()
+        if self.unacknowledged:
+            self._update_rows()
+        else:
+            self.alarm.stop()
+            self.window.withdraw()
+
+
+    def acknowledge_all(self):
+        for row in self.rows.values():
+            row.destroy()
+        self.rows.clear()
+        self.unacknowledged.clear()
+        self.alarm_keys.clear()
+        self.alarm_users.clear()
+        self.alarm.stop()
+        if self.window is not None:
+            self.window.withdraw()
 
 
 class SmartTimerApp:
-    def __init__(self, root):
+    LIST_HEIGHT = 8  # Timer rows in view, and in the Treeview
+
+    def __init__(self, root, profiler=None, use_asyncio=None, data_dir=None):
         self.root = root
         self.root.title("Smart Timer")
         self.root.geometry("900x700")
+        self.profiler = profiler or StartupProfiler(time.perf_counter())
         
         # Apply custom styling
         self.custom_style = CustomStyle(root)
-        
-        self.alarm = AlarmSound()
-        self.timers = []
+        self.profiler.mark('style')
+        
+        # The mixer is opened in the background once the window is shown
+        self.data_dir = Path(data_dir) if data_dir else user_data_dir()  # Journal, sounds, stats
+        self.alarm = AlarmSound(after=root.after, registry_path=self.data_dir / 'sounds.json')
+        self.notifications = NotificationCenter(root, self.alarm)
+        self.tree_rows = {}  # Treeview item id -> displayed values
+        self.list_offset = 0  # Index of the first sorted timer in view
+        self.selected_ids = set()  # Selected timer ids, including rows scrolled away
+        
+        # Refresh loops only run while something visible can change
+        self.iconified = False
+        self.refresh_pending = False
+        self.list_after_id = None
+        self.list_due_ns = None  # When the scheduled refresh should run, for tick.delay
+        self.clock_after_id = None
+        self.stats_window = None
+        self.timezone_time_label = None  # Built with its panel
+        self.groups_list = None  # Built with its panel
         
         # Add timezone manager
         self.tz_manager = TimeZoneManager()
         self.current_timezone = tk.StringVar(value="Local Time")
         
+        # In asyncio mode timers fire on the Tk thread from one event loop
+        self.event_loop = None
+        if use_asyncio is None:
+            use_asyncio = '--asyncio' in sys.argv or bool(os.environ.get('SMART_TIMER_ASYNCIO'))
+        if use_asyncio:
+            self.event_loop = TkEventLoop(root)
+            self.engine = TimerEngine(lambda on_fire: AsyncioScheduler(on_fire, self.event_loop),
+                                      self.tz_manager)
+        elif '--wheel' in sys.argv or os.environ.get('SMART_TIMER_WHEEL'):
+            # Timing wheel for very many short-lived timers; the tick bounds firing precision
+            tick_ns = 1_000_000
+            tick_ms = os.environ.get('SMART_TIMER_WHEEL_TICK_MS')
+            if tick_ms:
+                try:
+                    tick_ns = int(float(tick_ms) * 1_000_000)
+                    if not 1 <= tick_ns <= 60_000_000_000:
+                        raise ValueError("must be between 0.000001 and 60000")
+                except (ValueError, OverflowError) as error:
+                    print(f"Ignoring SMART_TIMER_WHEEL_TICK_MS={tick_ms!r} ({error}), using 1 ms",
+                          file=sys.stderr)
+                    tick_ns = 1_000_000
+            self.engine = TimerEngine(
+                lambda on_fire: TimerScheduler(on_fire, TimingWheelBackend(tick_ns)), self.tz_manager)
+        else:
+            self.engine = TimerEngine(tz_manager=self.tz_manager)
+        # The journal listens first, so the UI cannot keep it from seeing an event
+        self.journal = TimerJournal(self.data_dir)
+        self.engine.subscribe(self.journal.on_engine_event)
+        self.engine.subscribe(self.on_engine_event)
+        
+        # Completion actions run in worker processes
+        self.actions = ActionRunner(on_result=self.on_action_result)
+        self.engine.subscribe(self.actions.on_engine_event)
+        self.engine.stats.gauges['running_actions'] = lambda: self.actions._running
+        self.engine.stats.gauges['pending_actions'] = lambda: len(self.actions._pending)
+        
         # Timer groups storage remains the same
         self.timer_groups = {
             "Workout": [
@@ -375,15 +2865,87 @@ class SmartTimerApp:
                 {"name": "Black Tea", "duration": 300, "type": "duration", "sound": "beep"}
             ]
         }
+        # Groups that run step by step by default, and how many times
+        self.group_modes = {
+            "Workout": {"sequential": True, "repeat": 1},
+            "Pomodoro": {"sequential": True, "repeat": 4}
+        }
+        
+        # Restore timers and groups saved by the previous session
+        timers, groups = self.journal.restore(self.timer_from_record)
+        for name, timer_configs in groups.items():
+            if timer_configs is None:
+                self.timer_groups.pop(name, None)
+            else:
+                self.timer_groups[name] = timer_configs
+        # The journal is already listening, so restored timers that are due get removed
+        self.engine.add_many(timers)
+        self.profiler.mark('restore')
+        
+        # Opt-in local control socket for scripts
+        self.control = None
+        if '--control' in sys.argv or os.environ.get('SMART_TIMER_CONTROL'):
+            # The asyncio scheduler belongs to the Tk thread, so commands run there
+            dispatch = self.run_on_tk if self.event_loop is not None else None
+            self.control = ControlServer(self.engine, self.timer_groups, self.data_dir, dispatch=dispatch)
+            try:
+                self.control.start()
+            except OSError as error:
+                print(f"Control socket disabled: {error}", file=sys.stderr)
+                self.control = None
         
         # Create main scrollable container
         self.create_scrollable_container()
         
-        self.update_timer_list()
-        self.update_window_title()
-        self.center_window()
+        self.update_timer_list()
+        self.update_window_title()
+        self.center_window()
+        self.profiler.mark('widgets')
+        
+        self.current_timezone.trace_add('write', self.on_timezone_change)
+        self.root.bind('<Map>', self.on_window_state_change, add='+')
+        self.root.bind('<Unmap>', self.on_window_state_change, add='+')
+        self.root.bind('<Control-S>', self.show_stats_panel)  # Ctrl+Shift+S
+        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self.root.after_idle(self.on_first_paint)
+
+
+    @staticmethod
+    def timer_from_record(record):
+        recurrence = None
+        if record.get('repeat'):
+            recurrence = Recurrence(record['repeat'], record['zone'])
+        saved = record.get('pipeline')
+        if saved:
+            # The rest of the chain continues from the saved start time
+            pipeline = GroupPipeline(saved['name'], saved['steps'], saved['repeat'],
+                                     deadline_from_wall_ns(saved['start']))
+            return pipeline.make_timer(saved['step'])
+        return Timer(record['name'], None, record['type'], record['sound'],
+                     record['action'], record['path'],
+                     deadline=deadline_from_wall_ns(record['end']), recurrence=recurrence)
+
+
+    def on_first_paint(self):
+        self.profiler.mark('first paint')
+        threading.Thread(target=self.load_services, daemon=True).start()
+
+
+    def load_services(self):
+        """Load the audio subsystem and timezone database off the UI thread"""
+        started = time.perf_counter()
+        try:
+            self.alarm.init_mixer()
+        except Exception as error:  # No audio device; play() will retry later
+            print(f"Audio unavailable: {error}", file=sys.stderr)
+        self.profiler.record('audio', time.perf_counter() - started)
+        
+        started = time.perf_counter()
+        load_pytz()
+        self.profiler.record('timezones', time.perf_counter() - started)
         
-        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        if self.profiler.enabled:
+            print(self.profiler.report(), file=sys.stderr)
 
 
     def create_scrollable_container(self):
@@ -432,7 +2994,98 @@ class SmartTimerApp:
         # Timer creation frame with improved spacing
         create_frame = ttk.LabelFrame(main_frame, text="Create New Timer", padding="15")
         create_frame.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 15))
+        # Panels are filled in the first time they are scrolled into view
+        self.scroll_frame.add_lazy(create_frame, lambda: self.build_create_panel(create_frame))
+
+        # Timer list frame with improved layout
+        list_frame = ttk.LabelFrame(main_frame, text="Active Timers", padding="15")
+        list_frame.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=15)
+
+        # Sorting controls with better organization
+        sort_frame = ttk.Frame(list_frame)
+        sort_frame.grid(row=0, column=0, sticky="ew", pady=(0, 10))
+        
+        ttk.Label(sort_frame, text="Sort by:", style='Header.TLabel').pack(side=tk.LEFT, padx=(0, 15))
+        self.sort_var = tk.StringVar(value="time")
+        for text, value in [
+            ("Time Remaining", "time"),
+            ("Name", "name"),
+            ("Type", "type")
+        ]:
+            ttk.Radiobutton(sort_frame, text=text, variable=self.sort_var, 
+                           value=value, command=self.request_refresh).pack(side=tk.LEFT, padx=10)
+
+        # Next timer info with improved visibility
+        self.next_timer_label = ttk.Label(list_frame, text="", style='Header.TLabel')
+        self.next_timer_label.grid(row=1, column=0, sticky="w", pady=10)
+
+        # Timer list with improved appearance. The list is virtual: only the
+        # rows in view exist as Treeview items, so its own yview never moves.
+        self.tree = ttk.Treeview(list_frame, columns=('Name', 'Remaining', 'Type', 'Sound'), 
+                                show='headings', height=self.LIST_HEIGHT)
+        
+        # Configure column properties
+        columns = {
+            'Name': ('Timer Name', 200),
+            'Remaining': ('Time Remaining', 150),
+            'Type': ('Timer Type', 250),
+            'Sound': ('Sound Type', 150)
+        }
+        
+        for col, (heading, width) in columns.items():
+            self.tree.heading(col, text=heading)
+            self.tree.column(col, width=width, anchor='center')
+
+        self.tree.grid(row=2, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+        # The scrollbar moves the window over the sorted timers, not the Treeview
+        self.list_scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.on_list_scroll)
+        self.list_scrollbar.grid(row=2, column=1, sticky=(tk.N, tk.S))
+        self.tree.bind('<MouseWheel>', self.on_list_wheel)
+        self.tree.bind('<Button-4>', self.on_list_wheel)
+        self.tree.bind('<Button-5>', self.on_list_wheel)
+        self.tree.bind('<<TreeviewSelect>>', self.on_tree_select)
+        for key in ('<Up>', '<Down>', '<Prior>', '<Next>'):
+            self.tree.bind(key, self.on_list_key)
+
+        # Result of the latest completion action
+        self.action_status_label = ttk.Label(list_frame, text="")
+        self.action_status_label.grid(row=3, column=0, sticky="w", pady=(10, 0))
+
+        # Timer Groups frame with improved layout
+        groups_frame = ttk.LabelFrame(main_frame, text="Timer Groups", padding="15")
+        groups_frame.grid(row=3, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 15))
+        groups_frame.columnconfigure(0, weight=1)
+        self.scroll_frame.add_lazy(groups_frame, lambda: self.build_groups_panel(groups_frame))
+
+        # Main control buttons with improved layout and styling
+        control_frame = ttk.Frame(main_frame)
+        control_frame.grid(row=4, column=0, columnspan=2, pady=15)
+
+        ttk.Button(control_frame, text="Stop Selected", 
+                  command=self.stop_selected_timer,
+                  style='Warning.TButton').pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Remove Completed", 
+                  command=self.remove_completed_timers,
+                  style='Primary.TButton').pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Stop Alarm", 
+                  command=self.stop_alarm,
+                  style='Warning.TButton').pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Import...", 
+                  command=self.import_from_file,
+                  style='Primary.TButton').pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Export...", 
+                  command=self.export_to_file,
+                  style='Primary.TButton').pack(side=tk.LEFT, padx=5)
+
+        # Configure grid weights
+        main_frame.columnconfigure(0, weight=1)
+        main_frame.rowconfigure(2, weight=1)
+        list_frame.columnconfigure(0, weight=1)
+        list_frame.rowconfigure(2, weight=1)
 
+
+    def build_create_panel(self, create_frame):
         # Timer name with better layout
         name_frame = ttk.Frame(create_frame)
         name_frame.grid(row=0, column=0, columnspan=2, sticky='ew', pady=(0, 10))
@@ -495,11 +3148,59 @@ class SmartTimerApp:
         ]):
             ttk.Radiobutton(sound_frame, text=text, variable=self.sound_type, 
                            value=value).grid(row=0, column=i, padx=15)
+        ttk.Button(sound_frame, text="Add Sound...", 
+                  command=self.add_custom_sound).grid(row=0, column=3, padx=15)
+        
+        # Registered sound files, three per row under the presets
+        self.sound_frame = sound_frame
+        self.custom_sound_count = 0
+        for sound_type in self.alarm.custom_sounds:
+            self.add_sound_button(sound_type)
 
-        # Time zone selection with improved layout
+        # Time zone selection, itself built on first reveal
         timezone_frame = ttk.LabelFrame(create_frame, text="Time Zone", padding="10")
         timezone_frame.grid(row=4, column=0, columnspan=4, pady=(0, 15), padx=5, sticky="ew")
+        timezone_frame.columnconfigure(1, weight=1)
+        self.scroll_frame.add_lazy(timezone_frame, lambda: self.build_timezone_panel(timezone_frame))
+
+        # Completion action selection
+        action_frame = ttk.LabelFrame(create_frame, text="Completion Action", padding="10")
+        action_frame.grid(row=5, column=0, columnspan=4, pady=(0, 15), padx=5, sticky="ew")
+        
+        self.action_type = tk.StringVar(value="alert")
+        for i, (text, value) in enumerate([
+            ("Alert Only", "alert"),
+            ("Run Command", "command"),
+            ("Write to File", "file")
+        ]):
+            ttk.Radiobutton(action_frame, text=text, variable=self.action_type, 
+                           value=value).grid(row=0, column=i, padx=15)
         
+        self.action_path_var = tk.StringVar()
+        ttk.Entry(action_frame, textvariable=self.action_path_var, width=40).grid(
+            row=1, column=0, columnspan=3, sticky="ew", padx=15, pady=(10, 0))
+        ttk.Button(action_frame, text="Browse...", 
+                  command=self.browse_action_path).grid(row=1, column=3, pady=(10, 0))
+        action_frame.columnconfigure(2, weight=1)
+
+        # Optional repeat rule, in the selected time zone
+        repeat_frame = ttk.LabelFrame(create_frame, text="Repeat", padding="10")
+        repeat_frame.grid(row=6, column=0, columnspan=4, pady=(0, 15), padx=5, sticky="ew")
+        
+        self.repeat_var = tk.StringVar()
+        ttk.Entry(repeat_frame, textvariable=self.repeat_var, width=40).grid(
+            row=0, column=0, sticky="ew", padx=15)
+        ttk.Label(repeat_frame, text="e.g. every 15m, weekdays 07:30, cron 0 9 * * 1-5 (empty: once)",
+                 foreground=COLORS['secondary']).grid(row=1, column=0, sticky="w", padx=15, pady=(5, 0))
+        repeat_frame.columnconfigure(0, weight=1)
+
+        # Create timer button with improved styling
+        create_button = ttk.Button(create_frame, text="Create Timer", 
+                                 command=self.create_timer, style='Primary.TButton')
+        create_button.grid(row=7, column=0, columnspan=4, pady=(5, 0))
+
+
+    def build_timezone_panel(self, timezone_frame):
         ttk.Label(timezone_frame, text="Select Time Zone:").grid(row=0, column=0, padx=(0, 10))
         self.timezone_combobox = ttk.Combobox(timezone_frame, 
                                              textvariable=self.current_timezone,
@@ -511,63 +3212,9 @@ class SmartTimerApp:
         self.timezone_time_label.grid(row=0, column=2, padx=15)
         
         self.update_timezone_time()
-        
-        timezone_frame.columnconfigure(1, weight=1)
-
-        # Create timer button with improved styling
-        create_button = ttk.Button(create_frame, text="Create Timer", 
-                                 command=self.create_timer, style='Primary.TButton')
-        create_button.grid(row=5, column=0, columnspan=4, pady=(5, 0))
-
-        # Timer list frame with improved layout
-        list_frame = ttk.LabelFrame(main_frame, text="Active Timers", padding="15")
-        list_frame.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S), pady=15)
-
-        # Sorting controls with better organization
-        sort_frame = ttk.Frame(list_frame)
-        sort_frame.grid(row=0, column=0, sticky="ew", pady=(0, 10))
-        
-        ttk.Label(sort_frame, text="Sort by:", style='Header.TLabel').pack(side=tk.LEFT, padx=(0, 15))
-        self.sort_var = tk.StringVar(value="time")
-        for text, value in [
-            ("Time Remaining", "time"),
-            ("Name", "name"),
-            ("Type", "type")
-        ]:
-            ttk.Radiobutton(sort_frame, text=text, variable=self.sort_var, 
-                           value=value, command=self.update_timer_list).pack(side=tk.LEFT, padx=10)
-
-        # Next timer info with improved visibility
-        self.next_timer_label = ttk.Label(list_frame, text="", style='Header.TLabel')
-        self.next_timer_label.grid(row=1, column=0, sticky="w", pady=10)
-
-        # Timer list with improved appearance
-        self.tree = ttk.Treeview(list_frame, columns=('Name', 'Remaining', 'Type', 'Sound'), 
-                                show='headings', height=8)
-        
-        # Configure column properties
-        columns = {
-            'Name': ('Timer Name', 200),
-            'Remaining': ('Time Remaining', 150),
-            'Type': ('Timer Type', 250),
-            'Sound': ('Sound Type', 150)
-        }
-        
-        for col, (heading, width) in columns.items():
-            self.tree.heading(col, text=heading)
-            self.tree.column(col, width=width, anchor='center')
-
-        self.tree.grid(row=2, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-
-        # Add scrollbar with improved integration
-        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        scrollbar.grid(row=2, column=1, sticky=(tk.N, tk.S))
-        self.tree.configure(yscrollcommand=scrollbar.set)
 
-        # Timer Groups frame with improved layout
-        groups_frame = ttk.LabelFrame(main_frame, text="Timer Groups", padding="15")
-        groups_frame.grid(row=3, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 15))
 
+    def build_groups_panel(self, groups_frame):
         # Groups controls with better organization
         group_controls = ttk.Frame(groups_frame)
         group_controls.grid(row=0, column=0, sticky="ew", pady=(0, 10))
@@ -585,34 +3232,27 @@ class SmartTimerApp:
         ttk.Button(group_controls, text="Delete Group", 
                   command=self.delete_timer_group, 
                   style='Warning.TButton').pack(side=tk.LEFT, padx=5)
-
-        # Preview frame with improved visibility
+        
+        # Run the group's timers one after another, optionally several times
+        group_mode = ttk.Frame(groups_frame)
+        group_mode.grid(row=2, column=0, sticky="w", pady=(5, 0))
+        self.group_sequential_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(group_mode, text="One after another",
+                       variable=self.group_sequential_var).pack(side=tk.LEFT, padx=(0, 15))
+        ttk.Label(group_mode, text="Repeat:").pack(side=tk.LEFT, padx=(0, 5))
+        self.group_repeat_var = tk.StringVar(value="1")
+        ttk.Spinbox(group_mode, from_=1, to=99, textvariable=self.group_repeat_var,
+                   width=5).pack(side=tk.LEFT)
+
+        # Preview frame with improved visibility; its labels are reused
         self.preview_frame = ttk.Frame(groups_frame)
         self.preview_frame.grid(row=1, column=0, sticky="ew", pady=5)
+        self.preview_header = ttk.Label(self.preview_frame, text="Group contains:", 
+                                        font=('TkDefaultFont', 9, 'bold'))
+        self.preview_labels = []
         
         self.groups_list.bind('<<ComboboxSelected>>', self.update_group_preview)
 
-        # Main control buttons with improved layout and styling
-        control_frame = ttk.Frame(main_frame)
-        control_frame.grid(row=4, column=0, columnspan=2, pady=15)
-
-        ttk.Button(control_frame, text="Stop Selected", 
-                  command=self.stop_selected_timer,
-                  style='Warning.TButton').pack(side=tk.LEFT, padx=5)
-        ttk.Button(control_frame, text="Remove Completed", 
-                  command=self.remove_completed_timers,
-                  style='Primary.TButton').pack(side=tk.LEFT, padx=5)
-        ttk.Button(control_frame, text="Stop Alarm", 
-                  command=self.stop_alarm,
-                  style='Warning.TButton').pack(side=tk.LEFT, padx=5)
-
-        # Configure grid weights
-        main_frame.columnconfigure(0, weight=1)
-        main_frame.rowconfigure(2, weight=1)
-        list_frame.columnconfigure(0, weight=1)
-        list_frame.rowconfigure(2, weight=1)
-        groups_frame.columnconfigure(0, weight=1)
-
 
     def on_timer_type_change(self, *args):
         # Hide all time input frames
@@ -634,11 +3274,41 @@ class SmartTimerApp:
 
     def update_timezone_time(self):
         """Update the displayed time for the selected timezone"""
+        if self.clock_after_id is not None:
+            self.root.after_cancel(self.clock_after_id)
+            self.clock_after_id = None
+        
+        if self.timezone_time_label is None:
+            return  # The clock starts when its panel is first shown
+        
         timezone_name = self.current_timezone.get()
         current_time = self.tz_manager.get_current_time(timezone_name)
         self.timezone_time_label.config(
             text=f"Current time: {current_time.strftime('%H:%M:%S')}")
-        self.root.after(1000, self.update_timezone_time)  # Update every second
+        
+        # Tick again just after the next whole second, unless nobody can see it
+        if not self.iconified:
+            delay = 1000 - time.time_ns() // 1_000_000 % 1000
+            self.clock_after_id = self.root.after(delay, self.update_timezone_time)
+
+
+    def on_timezone_change(self, *args):
+        self.update_timezone_time()
+        self.request_refresh()
+
+
+    def on_window_state_change(self, event):
+        # Child widgets report Map/Unmap through the toplevel's bindtag as well
+        if event.widget is not self.root:
+            return
+        
+        iconified = event.type == tk.EventType.Unmap
+        if iconified == self.iconified:
+            return
+        self.iconified = iconified
+        if not iconified:
+            self.update_timezone_time()
+            self.request_refresh()
 
 
     def create_timer(self):
@@ -666,28 +3336,57 @@ class SmartTimerApp:
             messagebox.showerror("Error", "Please enter valid time values")
             return
 
+        action_type = self.action_type.get()
+        action_path = self.action_path_var.get().strip() or None
+        if action_type != 'alert' and not action_path:
+            messagebox.showerror("Error", "Please enter a command or file for the completion action")
+            return
+
         # Get the current timezone
         timezone_name = self.current_timezone.get()
         
-        if self.timer_type.get() == "target":
-            # Get current time in selected timezone
-            current_time = self.tz_manager.get_current_time(timezone_name)
+        repeat = self.repeat_var.get().strip()
+        if repeat:
+            # Recurring timers take their schedule from the rule alone
+            try:
+                recurrence = Recurrence(repeat, timezone_name)
+            except ValueError as error:
+                messagebox.showerror("Error", str(error))
+                return
+            now = time.monotonic_ns()
+            deadline = recurrence.next_deadline(now, now, self.tz_manager)
+            if deadline is None:
+                messagebox.showerror("Error", f"'{repeat}' never occurs")
+                return
+            timer = Timer(name, None, 'recurring', self.sound_type.get(), action_type, action_path,
+                          deadline=deadline, recurrence=recurrence)
+        elif self.timer_type.get() == "target":
+            # Get current wall time in selected timezone
+            current_time = self.tz_manager.get_current_time(timezone_name).replace(tzinfo=None)
             # Create target time in selected timezone
-            end_time = current_time.replace(
-                hour=hours, minute=minutes, second=seconds)
+            try:
+                end_time = current_time.replace(
+                    hour=hours, minute=minutes, second=seconds, microsecond=0)
+            except ValueError as error:
+                messagebox.showerror("Error", f"Invalid target time: {error}")
+                return
             if end_time < current_time:
                 end_time += timedelta(days=1)
             # Convert to local time for timer
             end_time = self.tz_manager.convert_to_local(end_time, timezone_name)
+            timer = Timer(name, end_time, self.timer_type.get(), self.sound_type.get(),
+                          action_type, action_path)
         else:
-            # For duration-based timers, simply add the duration to current local time
-            end_time = datetime.now() + timedelta(
-                hours=hours, minutes=minutes, seconds=seconds)
+            # Duration-based timers count down on the monotonic clock
+            try:
+                timer = Timer.after(name, hours * 3600 + minutes * 60 + seconds,
+                                    self.timer_type.get(), self.sound_type.get(),
+                                    action_type, action_path)
+            except ValueError as error:
+                messagebox.showerror("Error", str(error).capitalize())
+                return
 
-        timer = Timer(name, end_time, self.timer_type.get(), self.sound_type.get())
-        timer.thread = threading.Thread(target=self.run_timer, args=(timer,), daemon=True)
-        timer.thread.start()
-        self.timers.append(timer)
+        self.engine.add(timer)
 
         # Clear inputs
         self.name_var.set("")
@@ -695,113 +3394,362 @@ class SmartTimerApp:
         self.mins_var.set("0")
         self.secs_var.set("0")
         self.single_time_var.set("0")
+        self.repeat_var.set("")
+
+
+    def add_sound_button(self, sound_type):
+        row, column = divmod(self.custom_sound_count, 3)
+        ttk.Radiobutton(self.sound_frame, text=sound_type, variable=self.sound_type,
+                       value=sound_type).grid(row=row + 1, column=column, padx=15, pady=(5, 0), sticky="w")
+        self.custom_sound_count += 1
+
+
+    def add_custom_sound(self):
+        path = filedialog.askopenfilename(
+            parent=self.root, title="Add Alarm Sound",
+            filetypes=[("Audio files", "*.wav *.ogg"), ("All files", "*.*")])
+        if not path:
+            return
         
-        self.update_window_title()
+        known = set(self.alarm.custom_sounds)
+        try:
+            sound_type = self.alarm.add_custom_sound(path)
+        except Exception as error:  # No audio device or unsupported file
+            messagebox.showerror("Error", f"Could not load {os.path.basename(path)}: {error}")
+            return
+        if sound_type not in known:
+            self.add_sound_button(sound_type)
+        self.sound_type.set(sound_type)
+
+
+    def browse_action_path(self):
+        if self.action_type.get() == 'file':
+            path = filedialog.asksaveasfilename(parent=self.root, title="Write to File")
+        else:
+            path = filedialog.askopenfilename(parent=self.root, title="Run Command")
+            path = shlex.quote(path) if path and os.name != 'nt' else path
+        if path:
+            self.action_path_var.set(path)
 
 
-    def run_timer(self, timer):
-        while timer.active and not timer.is_finished():
-            time.sleep(0.1)
+    def on_action_result(self, result):
+        # Called from a pool thread; show the result from the Tk loop
+        if threading.current_thread() is not threading.main_thread():
+            self.root.after(0, self.on_action_result, result)
+            return
         
-        if timer.active:
-            self.alarm.play(timer.sound_type)
-            response = messagebox.showinfo(
-                "Timer Complete", 
-                f"Timer '{timer.name}' has finished!", 
-                type=messagebox.OK)
-            if response == "ok":
-                self.alarm.stop()
-            self.update_window_title()
+        if result['ok']:
+            text = f"Action for '{result['name']}' completed in {result['seconds']:.1f} s"
+        else:
+            detail = result.get('error') or result.get('stderr', '').strip() or f"exit code {result.get('returncode')}"
+            text = f"Action for '{result['name']}' failed: {detail}"
+        self.action_status_label.config(text=text)
 
 
-    def update_timer_list(self):
-        # Clear existing items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
+    def on_engine_event(self, event, timers):
+        # Engine events may come from the scheduler thread (not in asyncio mode);
+        # handle them in the Tk loop
+        if threading.current_thread() is not threading.main_thread():
+            self.root.after(0, self.on_engine_event, event, timers)
+            return
         
-        # Get active timers
-        active_timers = [t for t in self.timers if t.active and not t.is_finished()]
+        self.update_window_title()
+        self.request_refresh()
+        if event == 'finished':
+            self.notifications.notify(timers)
+
+
+    def show_stats_panel(self, event=None):
+        """Hidden panel with tick, firing and thread statistics"""
+        if self.stats_window is not None:
+            self.stats_window.deiconify()
+            self.stats_window.lift()
+            return
         
-        # Sort timers based on selected criteria
-        if self.sort_var.get() == "time":
-            active_timers.sort(key=lambda t: t.time_remaining())
-        elif self.sort_var.get() == "name":
-            active_timers.sort(key=lambda t: t.name.lower())
-        else:  # type
-            active_timers.sort(key=lambda t: t.timer_type)
+        self.stats_window = tk.Toplevel(self.root)
+        self.stats_window.title("Smart Timer Statistics")
+        self.stats_window.configure(bg=COLORS['background'])
+        self.stats_window.protocol("WM_DELETE_WINDOW", self.close_stats_panel)
+        
+        frame = ttk.Frame(self.stats_window, padding="15")
+        frame.pack(fill=tk.BOTH, expand=True)
+        self.stats_text = tk.Text(frame, width=90, height=20, font=('Consolas', 9))
+        self.stats_text.pack(fill=tk.BOTH, expand=True)
+        self.stats_status = ttk.Label(frame, text="")
+        self.stats_status.pack(anchor="w", pady=(5, 0))
+        
+        buttons = ttk.Frame(frame)
+        buttons.pack(fill=tk.X, pady=(10, 0))
+        ttk.Button(buttons, text="Dump JSON", command=self.dump_stats,
+                  style='Primary.TButton').pack(side=tk.LEFT, padx=5)
+        ttk.Button(buttons, text="Reset", command=self.engine.stats.reset,
+                  style='Warning.TButton').pack(side=tk.LEFT, padx=5)
+        self.update_stats_panel()
+
+
+    def update_stats_panel(self):
+        if self.stats_window is None:
+            return
+        snapshot = self.engine.stats.snapshot()
+        lines = [f"{'histogram (us)':<16}{'count':>8}{'p50':>10}{'p90':>10}{'p99':>10}{'p99.9':>10}{'max':>10}"]
+        for name, summary in snapshot['histograms_us'].items():
+            lines.append(f"{name:<16}{summary['count']:>8}{summary['p50']:>10}{summary['p90']:>10}"
+                         f"{summary['p99']:>10}{summary['p99.9']:>10}{summary['max']:>10}")
+        lines.append("")
+        for name, value in snapshot['gauges'].items():
+            lines.append(f"{name:<16}{value:>8}")
+        
+        self.stats_text.delete('1.0', tk.END)
+        self.stats_text.insert('1.0', "\n".join(lines))
+        self.stats_window.after(1000, self.update_stats_panel)
+
+
+    def close_stats_panel(self):
+        self.stats_window.destroy()
+        self.stats_window = None
+
+
+    def dump_stats(self):
+        path = self.data_dir / f"stats-{datetime.now():%Y%m%d-%H%M%S}.json"
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.engine.stats.dump(path)
+            self.stats_status.config(text=f"Saved to {path}")
+        except OSError as error:
+            self.stats_status.config(text=f"Could not save statistics: {error}")
+
+
+    def run_on_tk(self, function, timeout=10):
+        """Run function on the Tk thread from another thread and return its result"""
+        done = threading.Event()
+        outcome = []
+        def run():
+            try:
+                outcome.append((True, function()))
+            except Exception as error:
+                outcome.append((False, error))
+            done.set()
+        self.root.after(0, run)
+        if not done.wait(timeout):
+            raise TimeoutError("the user interface is not responding")
+        ok, value = outcome[0]
+        if not ok:
+            raise value
+        return value
+
+
+    def request_refresh(self):
+        """Refresh the timer list once Tk is idle, coalescing repeated requests"""
+        if not self.refresh_pending:
+            self.refresh_pending = True
+            self.root.after_idle(self.update_timer_list)
+
+
+    def update_timer_list(self):
+        self.refresh_pending = False
+        if self.list_after_id is not None:
+            self.root.after_cancel(self.list_after_id)
+            self.list_after_id = None
+        
+        # One clock reading for the whole refresh
+        now = time.monotonic_ns()
+        stats = self.engine.stats
+        if self.list_due_ns is not None:
+            stats.record('tick.delay', max(0, now - self.list_due_ns) // 1000)
+            self.list_due_ns = None
+        
+        # Get the active timers in view, already sorted by the selected criteria
+        total = self.engine.active_count()
+        self.list_offset = max(0, min(self.list_offset, total - self.LIST_HEIGHT))
+        filtered = time.monotonic_ns()
+        stats.record('tick.filter', (filtered - now) // 1000)
+        active_timers = self.engine.list(self.sort_var.get(), self.list_offset,
+                                         self.list_offset + self.LIST_HEIGHT)
+        sorted_at = time.monotonic_ns()
+        stats.record('tick.sort', (sorted_at - filtered) // 1000)
         
         # Update next timer info
-        if active_timers:
-            next_timer = min(active_timers, key=lambda t: t.time_remaining())
+        next_timer = self.engine.next_due()
+        if next_timer:
             self.next_timer_label.config(
-                text=f"Next timer: {next_timer.name} in {str(next_timer.time_remaining()).split('.')[0]}")
+                text=f"Next timer: {next_timer.name} in {format_remaining(next_timer.deadline - now)}")
         else:
             self.next_timer_label.config(text="No active timers")
         
-        # Add current timers to list
-        for timer in active_timers:
-            remaining = timer.time_remaining()
-            current_tz = self.current_timezone.get()
-            
-            # Convert end time to selected timezone for display
-            end_time_tz = self.tz_manager.convert_from_local(
-                timer.end_time, current_tz)
-            
-            self.tree.insert('', 'end', values=(
+        # Build the rows that should be displayed, keyed by timer id
+        current_tz = self.current_timezone.get()
+        rows = []
+        # Convert all end times to the selected timezone for display at once
+        end_times_tz = self.tz_manager.convert_many_from_utc(
+            [deadline_to_utc(timer.deadline) for timer in active_timers], current_tz)
+        converted = time.monotonic_ns()
+        stats.record('tick.tz', (converted - sorted_at) // 1000)
+        for timer, end_time_tz in zip(active_timers, end_times_tz):
+            rows.append((str(timer.id), (
                 timer.name,
-                str(remaining).split('.')[0],
+                format_remaining(timer.deadline - now),
                 f"{timer.timer_type} (ends: {end_time_tz.strftime('%H:%M:%S')})",
                 timer.sound_type
-            ))
+            )))
         
-        # Schedule next update
-        self.root.after(100, self.update_timer_list)
+        self.sync_tree_rows(rows)
+        if total:
+            self.list_scrollbar.set(self.list_offset / total,
+                                    min(total, self.list_offset + self.LIST_HEIGHT) / total)
+        else:
+            self.list_scrollbar.set(0, 1)
+        finished = time.monotonic_ns()
+        stats.record('tick.tree', (finished - converted) // 1000)
+        stats.record('tick.total', (finished - now) // 1000)
+        
+        # Schedule the next update for the moment a displayed countdown changes.
+        # Without timers or while iconified, engine and window events restart it.
+        if active_timers and not self.iconified:
+            next_change = min((t.deadline - now) % 1_000_000_000
+                              for t in active_timers + [next_timer])
+            delay_ms = next_change // 1_000_000 + 1
+            self.list_due_ns = finished + delay_ms * 1_000_000
+            self.list_after_id = self.root.after(delay_ms, self.update_timer_list)
+
+    def sync_tree_rows(self, rows):
+        """Apply only the differences between the displayed rows and `rows`"""
+        columns = self.tree['columns']
+        wanted = {iid for iid, _ in rows}
+        
+        # Remove rows of timers that are no longer active
+        stale = [iid for iid in self.tree_rows if iid not in wanted]
+        if stale:
+            self.tree.delete(*stale)
+            for iid in stale:
+                del self.tree_rows[iid]
+        
+        # Insert new rows and update only the cells whose text changed
+        for iid, values in rows:
+            shown = self.tree_rows.get(iid)
+            if shown is None:
+                self.tree.insert('', 'end', iid=iid, values=values)
+            elif shown != values:
+                for column, old, new in zip(columns, shown, values):
+                    if old != new:
+                        self.tree.set(iid, column, new)
+            self.tree_rows[iid] = values
+        
+        # Move rows only when the sort order actually changed
+        order = [iid for iid, _ in rows]
+        if list(self.tree.get_children()) != order:
+            for index, iid in enumerate(order):
+                self.tree.move(iid, '', index)
+        
+        # Rows scrolled back into view keep their selection
+        self.selected_ids = {iid for iid in self.selected_ids if int(iid) in self.engine.store.by_id}
+        selection = [iid for iid in order if iid in self.selected_ids]
+        if selection != list(self.tree.selection()):
+            self.tree.selection_set(selection)
+        if self.tree.yview()[0] != 0:
+            self.tree.yview_moveto(0)  # The window over the timers is list_offset alone
+
+
+    def on_tree_select(self, event=None):
+        # Rows outside the view keep their selection state
+        in_view = set(self.tree_rows)
+        self.selected_ids = {iid for iid in self.selected_ids if iid not in in_view}
+        self.selected_ids.update(self.tree.selection())
+
+
+    def scroll_list(self, rows):
+        self.list_offset = max(0, self.list_offset + rows)
+        self.update_timer_list()
+
+
+    def on_list_scroll(self, action, amount, unit=None):
+        if action == 'moveto':
+            total = self.engine.active_count()
+            self.list_offset = max(0, int(float(amount) * total))
+            self.update_timer_list()
+        else:  # 'scroll' by units or pages
+            step = self.LIST_HEIGHT if unit == 'pages' else 1
+            self.scroll_list(int(amount) * step)
+
+
+    def on_list_key(self, event):
+        # Moves inside the view are the Treeview's own; past its edges (and for
+        # whole pages) the window over the sorted timers moves instead
+        step = {'Up': -1, 'Down': 1, 'Prior': -self.LIST_HEIGHT, 'Next': self.LIST_HEIGHT}[event.keysym]
+        children = self.tree.get_children()
+        if not children:
+            return "break"
+        focus = self.tree.focus()
+        index = children.index(focus) if focus in children else 0
+        if abs(step) == 1 and 0 <= index + step < len(children):
+            return None
+        
+        total = self.engine.active_count()
+        position = max(0, min(total - 1, self.list_offset + index + step))
+        if position < self.list_offset:
+            self.list_offset = position
+        elif position >= self.list_offset + self.LIST_HEIGHT:
+            self.list_offset = position - self.LIST_HEIGHT + 1
+        target = self.engine.list(self.sort_var.get(), position, position + 1)
+        if target:
+            self.selected_ids = {str(target[0].id)}
+        self.update_timer_list()
+        if target and str(target[0].id) in self.tree_rows:
+            self.tree.focus(str(target[0].id))
+        return "break"
+
+
+    def on_list_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.scroll_list(-3)
+        else:
+            self.scroll_list(3)
+        return "break"  # Keep the page itself from scrolling
+
 
     def update_window_title(self):
-        active_count = len([t for t in self.timers if t.active and not t.is_finished()])
+        active_count = self.engine.active_count()
         self.root.title(f"Smart Timer ({active_count} active)")
 
     def stop_alarm(self):
         self.alarm.stop()
 
     def stop_selected_timer(self):
-        selected = self.tree.selection()
+        selected = self.tree.selection() or sorted(self.selected_ids, key=int)
         if not selected:
             return
         
-        item = selected[0]
-        timer_name = self.tree.item(item)['values'][0]
-        
-        for timer in self.timers:
-            if timer.name == timer_name:
-                timer.active = False
-                break
-        
-        self.update_window_title()
+        self.engine.stop(int(selected[0]))
 
     def remove_completed_timers(self):
-        self.timers = [t for t in self.timers if not t.is_finished() and t.active]
-        self.update_window_title()
+        self.engine.remove_completed()
 
     def update_group_preview(self, event=None):
-        # Clear previous preview
-        for widget in self.preview_frame.winfo_children():
-            widget.destroy()
-        
         selected_group = self.groups_list.get()
-        if selected_group in self.timer_groups:
-            # Create preview labels
-            ttk.Label(self.preview_frame, text="Group contains:", 
-                     font=('TkDefaultFont', 9, 'bold')).pack(anchor="w")
-            
-            for timer_config in self.timer_groups[selected_group]:
-                duration_mins = timer_config['duration'] // 60
-                duration_secs = timer_config['duration'] % 60
-                time_str = f"{duration_mins}m {duration_secs}s" if duration_secs else f"{duration_mins}m"
-                
-                ttk.Label(self.preview_frame, 
-                         text=f"• {timer_config['name']} ({time_str}, {timer_config['sound']} sound)").pack(
-                             anchor="w", padx=10)
+        if event is not None:
+            mode = self.group_modes.get(selected_group, {"sequential": False, "repeat": 1})
+            self.group_sequential_var.set(mode['sequential'])
+            self.group_repeat_var.set(str(mode['repeat']))
+        timer_configs = self.timer_groups.get(selected_group, [])
+        if timer_configs:
+            self.preview_header.grid(row=0, column=0, sticky="w")
+        else:
+            self.preview_header.grid_remove()
+        
+        # Reuse the preview labels; new ones are only needed for a longer group
+        while len(self.preview_labels) < len(timer_configs):
+            label = ttk.Label(self.preview_frame)
+            label.grid(row=len(self.preview_labels) + 1, column=0, sticky="w", padx=10)
+            self.preview_labels.append(label)
+        for index, label in enumerate(self.preview_labels):
+            if index >= len(timer_configs):
+                label.grid_remove()
+                continue
+            timer_config = timer_configs[index]
+            duration_mins = timer_config['duration'] // 60
+            duration_secs = timer_config['duration'] % 60
+            time_str = f"{duration_mins}m {duration_secs}s" if duration_secs else f"{duration_mins}m"
+            label.config(text=f"• {timer_config['name']} ({time_str}, {timer_config['sound']} sound)")
+            label.grid()
 
 
     def start_timer_group(self):
@@ -814,34 +3762,98 @@ class SmartTimerApp:
             messagebox.showerror("Error", "Selected group not found")
             return
             
-        # Start all timers in the group
-        for timer_config in self.timer_groups[selected_group]:
-            end_time = datetime.now() + timedelta(seconds=timer_config['duration'])
-            
-            timer = Timer(
-                timer_config['name'],
-                end_time,
-                timer_config['type'],
-                timer_config['sound']
-            )
-            timer.thread = threading.Thread(target=self.run_timer, args=(timer,), daemon=True)
-            timer.thread.start()
-            self.timers.append(timer)
-        
-        messagebox.showinfo("Success", f"Started all timers in group '{selected_group}'")
-        self.update_window_title()
+        sequential = self.group_sequential_var.get()
+        try:
+            repeat = int(self.group_repeat_var.get())
+            if repeat < 1:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "Please enter a valid repeat count")
+            return
+        
+        self.engine.start_group(self.timer_groups[selected_group], sequential, repeat, selected_group)
+        
+        if sequential:
+            messagebox.showinfo("Success", f"Started group '{selected_group}' one timer after another")
+        else:
+            messagebox.showinfo("Success", f"Started all timers in group '{selected_group}'")
+
+
+    def add_timer_group(self, group_name, timer_configs):
+        self.timer_groups[group_name] = timer_configs
+        self.journal.record_group(group_name, timer_configs)
+        if self.groups_list is not None:
+            self.groups_list['values'] = list(self.timer_groups.keys())
+
+
+    def import_from_file(self):
+        path = filedialog.askopenfilename(
+            parent=self.root, title="Import Timers",
+            filetypes=[("Timer exports", "*.jsonl *.json *.csv"), ("All files", "*.*")])
+        if not path:
+            return
+        self.action_status_label.config(text=f"Importing {os.path.basename(path)}...")
+        # Parse off the Tk thread; every batch refreshes the list through engine events
+        threading.Thread(target=self.run_import, args=(path,), daemon=True).start()
+
+
+    def run_import(self, path):
+        def on_group(name, timer_configs):
+            self.root.after(0, self.add_timer_group, name, timer_configs)
+        # The asyncio scheduler belongs to the Tk thread, so batches are added there
+        dispatch = self.run_on_tk if self.event_loop is not None else None
+        try:
+            result = import_timers(path, self.engine, on_group, dispatch=dispatch)
+        except Exception as error:  # Any failure must still end the "Importing..." state
+            result = error
+        self.root.after(0, self.on_import_done, path, result)
+
+
+    def on_import_done(self, path, result):
+        if isinstance(result, Exception):
+            self.action_status_label.config(text="")
+            messagebox.showerror("Error", f"Could not import {path}: {result}")
+            return
+        
+        added, groups, errors, dropped = result
+        text = f"Imported {added} timers and {groups} groups from {os.path.basename(path)}"
+        if errors:
+            text += f", skipped {len(errors)} invalid records"
+            messagebox.showwarning("Import", "\n".join(errors[:10] + (["..."] if len(errors) > 10 else [])))
+        if dropped:
+            text += f", {len(dropped)} completion actions turned into alerts"
+            messagebox.showwarning(
+                "Import",
+                "These timers came with commands or files to open. For safety they were "
+                "imported as plain alerts:\n\n"
+                + "\n".join(dropped[:10] + (["..."] if len(dropped) > 10 else [])))
+        self.action_status_label.config(text=text)
+
+
+    def export_to_file(self):
+        path = filedialog.asksaveasfilename(
+            parent=self.root, title="Export Timers", defaultextension=".jsonl",
+            filetypes=[("JSON lines", "*.jsonl"), ("CSV", "*.csv")])
+        if not path:
+            return
+        try:
+            rows = export_timers(path, self.engine.list(), self.timer_groups)
+        except OSError as error:
+            messagebox.showerror("Error", f"Could not export timers: {error}")
+            return
+        self.action_status_label.config(text=f"Exported {rows} records to {os.path.basename(path)}")
 
 
     def save_current_as_group(self):
         # Get active timers
-        active_timers = [t for t in self.timers if t.active and not t.is_finished()]
+        active_timers = self.engine.list()
         
         if not active_timers:
             messagebox.showwarning("Warning", "No active timers to save as a group")
             return
             
         # Prompt for group name
-        group_name = tk.simpledialog.askstring("Save Timer Group", 
+        group_name = simpledialog.askstring("Save Timer Group", 
                                              "Enter a name for this timer group:",
                                              parent=self.root)
         
@@ -861,12 +3873,10 @@ class SmartTimerApp:
                 "sound": timer.sound_type
             })
         
-        self.timer_groups[group_name] = timer_configs
-        
-        # Update groups list
-        self.groups_list['values'] = list(self.timer_groups.keys())
-        self.groups_list.set(group_name)
-        self.update_group_preview()
+        self.add_timer_group(group_name, timer_configs)
+        if self.groups_list is not None:
+            self.groups_list.set(group_name)
+            self.update_group_preview()
         
         messagebox.showinfo("Success", f"Saved current timers as group '{group_name}'")
 
@@ -880,6 +3890,8 @@ class SmartTimerApp:
         if messagebox.askyesno("Confirm Delete", 
                               f"Are you sure you want to delete the group '{selected_group}'?"):
             del self.timer_groups[selected_group]
+            self.group_modes.pop(selected_group, None)
+            self.journal.record_group_delete(selected_group)
             self.groups_list['values'] = list(self.timer_groups.keys())
             self.groups_list.set('')
             self.update_group_preview()
@@ -887,13 +3899,23 @@ class SmartTimerApp:
 
 
     def on_closing(self):
+        if self.control is not None:
+            self.control.close()
+        self.engine.shutdown()
+        self.actions.shutdown()
+        self.journal.close()
+        if self.event_loop is not None:
+            self.event_loop.close()
         self.alarm.cleanup()
         self.root.destroy()
 
 
 def main():
+    profiler = StartupProfiler(_STARTUP_BEGIN)
+    profiler.mark('imports')
     root = tk.Tk()
-    app = SmartTimerApp(root)
+    profiler.mark('tk')
+    app = SmartTimerApp(root, profiler)
     root.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,387 @@
+"""Benchmarks for the Smart Timer hot paths
+
+Usage:
+    python lab_2_gui_timer_bench.py [--repeat N] [--only NAME ...]
+                                    [--output results.json]
+                                    [--compare baseline.json] [--threshold 0.1]
+
+Results are written as JSON (to stdout unless --output is given). With
+--compare, each benchmark is also checked against a saved baseline and the
+script exits with status 1 if any of them got slower than the threshold.
+Some benchmarks also check the behaviour they measure (e.g. wheel_cascade
+fires every timer exactly on time) and abort the run if it is wrong.
+
+The Treeview benchmarks need a display; on headless machines run the suite
+under Xvfb (xvfb-run python lab_2_gui_timer_bench.py). Benchmarks whose
+dependencies are missing are reported as skipped instead of failing.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Headless audio for AlarmSound benchmarks
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import lab_2_gui_timer as smart_timer
+
+
+TIMER_COUNTS = (10, 100, 1000, 10000)
+SORT_MODES = ("time", "name", "type")
+TIMEZONE = "US (New York)"
+GROUP = [
+    {"name": "Warm-up", "duration": 300, "type": "duration", "sound": "gentle"},
+    {"name": "Main Exercise", "duration": 1800, "type": "duration", "sound": "melody"},
+    {"name": "Cool-down", "duration": 300, "type": "duration", "sound": "gentle"}
+]
+
+
+class Skip(Exception):
+    """Raised by a benchmark whose dependencies are unavailable"""
+
+
+class ListBackend:
+    """The original scheduling: one list, scanned in full on every check
+
+    Cancelling only marks the timer inactive, so dead entries stay in the
+    list until they would have expired.
+    """
+    def __init__(self):
+        self.timers = []
+
+    def add(self, timer):
+        self.timers.append(timer)
+
+    def cancel(self, timer):
+        pass
+
+    def pop_due(self, now):
+        due = [timer for timer in self.timers if timer.deadline <= now]
+        self.timers = [timer for timer in self.timers if timer.deadline > now]
+        return [timer for timer in due if timer.active]
+
+
+SCHEDULER_BACKENDS = {
+    "list": ListBackend,
+    "heap": smart_timer.HeapBackend,
+    "wheel": lambda: smart_timer.TimingWheelBackend(now=0)
+}
+
+
+def make_timers(count):
+    # Far enough in the future that nothing fires while measuring
+    now = datetime.now()
+    sounds = ('beep', 'melody', 'gentle')
+    types = ('duration', 'target', 'minutes', 'seconds')
+    return [smart_timer.Timer(f"Timer {i:05d}",
+                              now + timedelta(hours=1, seconds=(i * 7919) % 3600),
+                              types[i % len(types)],
+                              sounds[i % len(sounds)])
+            for i in range(count)]
+
+
+def bench_timer_create(count):
+    def setup():
+        return smart_timer.TimerEngine(), make_timers(count)
+
+    def run(state):
+        engine, timers = state
+        for timer in timers:
+            engine.add(timer)
+
+    def teardown(state):
+        state[0].shutdown()
+
+    return setup, run, teardown
+
+
+def bench_group_start(groups, sequential=False):
+    def setup():
+        return smart_timer.TimerEngine()
+
+    def run(engine):
+        for _ in range(groups):
+            engine.start_group(GROUP, sequential, repeat=10)
+
+    def teardown(engine):
+        engine.shutdown()
+
+    return setup, run, teardown
+
+
+def bench_scheduler_churn(backend_name, count, checks=600):
+    """Add `count` timers over a minute, cancel half, and fire the rest checking every 100 ms"""
+    def setup():
+        timers = [smart_timer.Timer(f"Timer {i}", None, deadline=(i * 7919) % 60_000 * 1_000_000)
+                  for i in range(count)]
+        return SCHEDULER_BACKENDS[backend_name](), timers
+
+    def run(state):
+        backend, timers = state
+        for timer in timers:
+            backend.add(timer)
+        for timer in timers[::2]:
+            timer.active = False
+            backend.cancel(timer)
+        fired = 0
+        for check in range(1, checks + 1):
+            fired += len(backend.pop_due(check * 60_000 * 1_000_000 // checks))
+        assert fired == count - len(timers[::2])
+
+    return setup, run, None
+
+
+def bench_engine_churn(backend_name, count):
+    """Add `count` timers through TimerEngine and stop them one by one, as a client would"""
+    def setup():
+        backend = SCHEDULER_BACKENDS[backend_name]
+        if backend_name == "wheel":
+            backend = smart_timer.TimingWheelBackend
+        engine = smart_timer.TimerEngine(lambda on_fire: smart_timer.TimerScheduler(on_fire, backend()))
+        timers = [smart_timer.Timer.after(f"Timer {i}", 3600 + (i * 7919) % 3600) for i in range(count)]
+        return engine, timers
+
+    def run(state):
+        engine, timers = state
+        engine.add_many(timers)
+        for timer in timers:
+            engine.stop(timer.id)
+        assert engine.active_count() == 0
+
+    def teardown(state):
+        state[0].shutdown()
+
+    return setup, run, teardown
+
+
+def bench_wheel_cascade(count):
+    """Drive a small wheel through every level and the overflow slot, checking each firing
+
+    With 2 levels of 64 one-nanosecond ticks, deadlines past 4096 ticks start
+    in the overflow slot and cascade twice before firing. Every timer must fire
+    on the first check at or after its deadline, cancelled ones never, and the
+    reported wakeup must never be later than the earliest pending deadline.
+    """
+    def setup():
+        deadlines = [1 + (i * 7919) % 40_000 for i in range(count)]
+        deadlines += [1, 63, 64, 65, 4095, 4096, 4097, 262_144, 262_145]  # Level and overflow edges
+        timers = [smart_timer.Timer(f"Timer {i}", None, deadline=deadline)
+                  for i, deadline in enumerate(deadlines)]
+        return smart_timer.TimingWheelBackend(tick_ns=1, levels=2, now=0), timers
+
+    def run(state):
+        wheel, timers = state
+        for timer in timers:
+            wheel.add(timer)
+        pending = {timer.id: timer for timer in timers}
+        last = max(timer.deadline for timer in timers)
+        now = 0
+        while pending:
+            assert now <= last, "timers were lost"
+            earliest = min(timer.deadline for timer in pending.values())
+            wakeup = wheel.next_wakeup()
+            assert wakeup is not None and wakeup <= earliest, (wakeup, earliest)
+            if now == 500:
+                # Cancel some timers after they cascaded out of the overflow slot
+                for timer in list(pending.values())[::7]:
+                    timer.active = False
+                    wheel.cancel(timer)
+                    del pending[timer.id]
+            previous, now = now, now + 1 + now % 97  # Uneven steps across slot boundaries
+            for timer in wheel.pop_due(now):
+                # Due since the previous check: neither early nor late
+                assert timer.id in pending and previous < timer.deadline <= now, (timer.deadline, now)
+                del pending[timer.id]
+        assert len(wheel) == 0 and wheel.next_wakeup() is None
+
+    return setup, run, None
+
+
+def bench_list_refresh(count, sort_mode):
+    def setup():
+        try:
+            root = smart_timer.tk.Tk()
+        except smart_timer.tk.TclError as error:
+            raise Skip(f"no display ({error})")
+        root.withdraw()
+        # A throwaway data directory keeps the user's journal out of the way
+        data_dir = tempfile.TemporaryDirectory()
+        app = smart_timer.SmartTimerApp(root, data_dir=data_dir.name)
+        app.engine.add_many(make_timers(count))
+        app.sort_var.set(sort_mode)
+        app.update_timer_list()  # First refresh inserts every row
+        return data_dir, app
+
+    def run(state):
+        state[1].update_timer_list()
+
+    def teardown(state):
+        data_dir, app = state
+        app.on_closing()  # Stops the engine and closes the journal
+        data_dir.cleanup()
+
+    return setup, run, teardown
+
+
+def bench_alarm_construct(warm):
+    def setup():
+        try:
+            smart_timer.load_pygame()
+        except ImportError:
+            raise Skip("pygame is not installed")
+        directory = tempfile.TemporaryDirectory()
+        cache = smart_timer.SoundCache(directory.name)
+        if warm:
+            alarm = smart_timer.AlarmSound(cache)
+            for sound_type in alarm.SOUND_PRESETS:
+                alarm.get_sound(sound_type)
+        return directory, cache
+
+    def run(state):
+        alarm = smart_timer.AlarmSound(state[1])
+        for sound_type in alarm.SOUND_PRESETS:
+            alarm.get_sound(sound_type)
+
+    def teardown(state):
+        state[0].cleanup()
+
+    return setup, run, teardown
+
+
+def bench_tz_convert(count, batched):
+    def setup():
+        try:
+            smart_timer.load_pytz()
+        except ImportError:
+            raise Skip("pytz is not installed")
+        return smart_timer.TimeZoneManager(), [t.end_time for t in make_timers(count)]
+
+    def run(state):
+        manager, end_times = state
+        if batched:
+            manager.convert_many_from_local(end_times, TIMEZONE)
+        else:
+            for end_time in end_times:
+                manager.convert_from_local(end_time, TIMEZONE)
+
+    return setup, run, None
+
+
+def all_benchmarks():
+    benchmarks = {}
+    for count in (100, 1000, 10000):
+        benchmarks[f"timer_create[{count}]"] = bench_timer_create(count)
+    benchmarks["group_start[100]"] = bench_group_start(100)
+    benchmarks["group_start[100,sequential]"] = bench_group_start(100, sequential=True)
+    for count in (1000, 10000, 100000):
+        for backend_name in SCHEDULER_BACKENDS:
+            benchmarks[f"scheduler_churn[{backend_name},{count}]"] = bench_scheduler_churn(backend_name, count)
+    for count in (10000, 100000):
+        for backend_name in ("heap", "wheel"):
+            benchmarks[f"engine_churn[{backend_name},{count}]"] = bench_engine_churn(backend_name, count)
+    benchmarks["wheel_cascade[2000]"] = bench_wheel_cascade(2000)
+    for count in TIMER_COUNTS:
+        for sort_mode in SORT_MODES:
+            benchmarks[f"list_refresh[{count},{sort_mode}]"] = bench_list_refresh(count, sort_mode)
+    benchmarks["alarm_construct[cold]"] = bench_alarm_construct(warm=False)
+    benchmarks["alarm_construct[warm]"] = bench_alarm_construct(warm=True)
+    for count in (100, 10000):
+        benchmarks[f"tz_convert[{count},single]"] = bench_tz_convert(count, batched=False)
+        benchmarks[f"tz_convert[{count},batch]"] = bench_tz_convert(count, batched=True)
+    return benchmarks
+
+
+def measure(benchmark, repeat):
+    setup, run, teardown = benchmark
+    runs = []
+    for _ in range(repeat):
+        state = setup()
+        try:
+            started = time.perf_counter()
+            run(state)
+            runs.append(time.perf_counter() - started)
+        finally:
+            if teardown:
+                teardown(state)
+    return {
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "mean": statistics.fmean(runs),
+        "runs": runs
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print a comparison table and return the names that regressed"""
+    regressions = []
+    print(f"{'benchmark':<32} {'baseline':>12} {'current':>12} {'change':>8}", file=sys.stderr)
+    for name, result in results.items():
+        before = baseline.get(name)
+        if "median" not in result or not before or "median" not in before:
+            continue
+        change = result["median"] / before["median"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  SLOWER"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  faster"
+        print(f"{name:<32} {before['median'] * 1000:10.3f}ms {result['median'] * 1000:10.3f}ms "
+              f"{change:+7.1%}{flag}", file=sys.stderr)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Smart Timer benchmark suite")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per benchmark")
+    parser.add_argument("--only", nargs="*", default=(),
+                        help="run benchmarks whose name starts with one of these prefixes")
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="relative slowdown reported as a regression (default 0.1)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name, benchmark in all_benchmarks().items():
+        if args.only and not name.startswith(tuple(args.only)):
+            continue
+        try:
+            results[name] = measure(benchmark, args.repeat)
+            print(f"{name:<32} {results[name]['median'] * 1000:10.3f} ms", file=sys.stderr)
+        except Skip as reason:
+            results[name] = {"skipped": str(reason)}
+            print(f"{name:<32} skipped: {reason}", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat
+        },
+        "results": results
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)["results"]
+        if compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())